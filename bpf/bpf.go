@@ -1468,8 +1468,13 @@ func MemberToIPMask(member string) (*net.IP, int, error) {
 }
 
 func maybeDeleteIface(name string) error {
-	args := []string{"-c", fmt.Sprintf("ip link del %s || true", name)}
-	output, err := exec.Command("/bin/sh", args...).CombinedOutput()
+	// Run "ip" directly rather than via a shell.  A non-zero exit status just means that the
+	// interface wasn't there to delete, so only fail if we couldn't run the command at all.
+	output, err := exec.Command("ip", "link", "del", name).CombinedOutput()
+	if _, ok := err.(*exec.ExitError); ok {
+		log.WithError(err).WithField("iface", name).Debugf("ip link del failed: %s", output)
+		return nil
+	}
 	if err != nil {
 		return fmt.Errorf("cannot run ip command: %v\n%s", err, output)
 	}
@@ -727,6 +727,9 @@ func (m *bpfEndpointManager) updatePolicyProgram(jumpMapFD bpf.MapFD, rules [][]
 	return nil
 }
 
+// tcFilterProgIDRegexp extracts the BPF program ID from a line of "tc filter show" output.
+var tcFilterProgIDRegexp = regexp.MustCompile(`id (\d+)`)
+
 func FindJumpMap(ap tc.AttachPoint) (bpf.MapFD, error) {
 	tcCmd := exec.Command("tc", "filter", "show", "dev", ap.Iface, string(ap.Hook))
 	out, err := tcCmd.Output()
@@ -738,8 +741,7 @@ func FindJumpMap(ap tc.AttachPoint) (bpf.MapFD, error) {
 	for _, line := range bytes.Split(out, []byte("\n")) {
 		line := string(line)
 		if strings.Contains(line, progName) {
-			re := regexp.MustCompile(`id (\d+)`)
-			m := re.FindStringSubmatch(line)
+			m := tcFilterProgIDRegexp.FindStringSubmatch(line)
 			if len(m) > 0 {
 				progIDStr := m[1]
 				bpftool := exec.Command("bpftool", "prog", "show", "id", progIDStr, "--json")
@@ -22,8 +22,10 @@ import (
 	"reflect"
 	"regexp"
 	"strings"
+	"sync"
 
 	log "github.com/sirupsen/logrus"
+	"golang.org/x/sys/unix"
 
 	"github.com/projectcalico/felix/ifacemonitor"
 	"github.com/projectcalico/felix/ip"
@@ -34,6 +36,9 @@ import (
 	"github.com/projectcalico/libcalico-go/lib/set"
 )
 
+// maxConcurrentInterfaceConfigs limits the number of interfaces that we configure in parallel.
+const maxConcurrentInterfaceConfigs = 16
+
 // routeTableSyncer is the interface used to manage data-sync of route table managers. This includes notification of
 // interface state changes, hooks to queue a full resync and apply routing updates.
 type routeTableSyncer interface {
@@ -682,9 +687,10 @@ func (m *endpointManager) resolveWorkloadEndpoints() {
 		m.needToCheckEndpointMarkChains = true
 	}
 
+	ifaceErrs := m.configureInterfaces(m.wlIfaceNamesToReconfigure)
 	m.wlIfaceNamesToReconfigure.Iter(func(item interface{}) error {
 		ifaceName := item.(string)
-		err := m.configureInterface(ifaceName)
+		err := ifaceErrs[ifaceName]
 		if err != nil {
 			if exists, err := m.interfaceExistsInProcSys(ifaceName); err == nil && !exists {
 				// Suppress log spam if interface has been removed.
@@ -1067,6 +1073,42 @@ func (m *endpointManager) interfaceExistsInProcSys(name string) (bool, error) {
 	return true, nil
 }
 
+// configureInterfaces applies the /proc/sys configuration to each of the named interfaces, returning
+// the error (if any) for each interface.  The writes for each interface are independent and each one
+// blocks in the kernel so, when there are several interfaces to configure (for example after a restart
+// or during pod churn), we fan the work out over a bounded number of goroutines.
+func (m *endpointManager) configureInterfaces(ifaceNames set.Set) map[string]error {
+	errs := map[string]error{}
+	if ifaceNames.Len() == 1 {
+		ifaceNames.Iter(func(item interface{}) error {
+			ifaceName := item.(string)
+			errs[ifaceName] = m.configureInterface(ifaceName)
+			return nil
+		})
+		return errs
+	}
+
+	var wg sync.WaitGroup
+	var errsLock sync.Mutex
+	semaphore := make(chan struct{}, maxConcurrentInterfaceConfigs)
+	ifaceNames.Iter(func(item interface{}) error {
+		ifaceName := item.(string)
+		wg.Add(1)
+		semaphore <- struct{}{}
+		go func() {
+			defer wg.Done()
+			err := m.configureInterface(ifaceName)
+			<-semaphore
+			errsLock.Lock()
+			errs[ifaceName] = err
+			errsLock.Unlock()
+		}()
+		return nil
+	})
+	wg.Wait()
+	return errs
+}
+
 func (m *endpointManager) configureInterface(name string) error {
 	if !m.activeUpIfaces.Contains(name) {
 		log.WithField("ifaceName", name).Info(
@@ -1145,17 +1187,28 @@ func (m *endpointManager) configureInterface(name string) error {
 	return nil
 }
 
+// writeProcSys writes the given value to a /proc/sys file.  We write to many of these files for each
+// interface so we use raw syscalls rather than an os.File, which would also try to register the file
+// with the runtime's poller and attach a finalizer, neither of which is useful for a one-shot write.
 func writeProcSys(path, value string) error {
-	f, err := os.OpenFile(path, os.O_WRONLY, 0)
+	fd, err := unix.Open(path, unix.O_WRONLY|unix.O_CLOEXEC, 0)
+	for err == unix.EINTR {
+		fd, err = unix.Open(path, unix.O_WRONLY|unix.O_CLOEXEC, 0)
+	}
 	if err != nil {
-		return err
+		return &os.PathError{Op: "open", Path: path, Err: err}
+	}
+	n, err := unix.Write(fd, []byte(value))
+	for err == unix.EINTR {
+		n, err = unix.Write(fd, []byte(value))
 	}
-	n, err := f.Write([]byte(value))
-	if err == nil && n < len(value) {
+	if err != nil {
+		err = &os.PathError{Op: "write", Path: path, Err: err}
+	} else if n < len(value) {
 		err = io.ErrShortWrite
 	}
-	if err1 := f.Close(); err == nil {
-		err = err1
+	if err1 := unix.Close(fd); err == nil && err1 != nil {
+		err = &os.PathError{Op: "close", Path: path, Err: err1}
 	}
 	return err
 }
@@ -19,6 +19,7 @@ import (
 	"fmt"
 	"os"
 	"strings"
+	"sync"
 
 	"github.com/projectcalico/felix/ifacemonitor"
 
@@ -1797,6 +1798,7 @@ var _ = Describe("EndpointManager IPv4", endpointManagerTests(4))
 var _ = Describe("EndpointManager IPv6", endpointManagerTests(6))
 
 type testProcSys struct {
+	lock           sync.Mutex
 	state          map[string]string
 	pathsThatExist map[string]bool
 	Fail           bool
@@ -1811,6 +1813,8 @@ func (t *testProcSys) write(path, value string) error {
 		"path":  path,
 		"value": value,
 	}).Info("testProcSys writer")
+	t.lock.Lock()
+	defer t.lock.Unlock()
 	if t.Fail {
 		return procSysFail
 	}
@@ -1819,6 +1823,8 @@ func (t *testProcSys) write(path, value string) error {
 }
 
 func (t *testProcSys) stat(path string) (os.FileInfo, error) {
+	t.lock.Lock()
+	defer t.lock.Unlock()
 	exists := t.pathsThatExist[path]
 	if exists {
 		return nil, nil
@@ -1828,5 +1834,7 @@ func (t *testProcSys) stat(path string) (os.FileInfo, error) {
 }
 
 func (t *testProcSys) checkState(expected map[string]string) {
+	t.lock.Lock()
+	defer t.lock.Unlock()
 	Expect(t.state).To(Equal(expected))
 }
@@ -15,6 +15,7 @@
 package intdataplane
 
 import (
+	"fmt"
 	"os/exec"
 
 	"github.com/vishvananda/netlink"
@@ -58,5 +59,11 @@ func (r realIPIPNetlink) AddrDel(link netlink.Link, addr *netlink.Addr) error {
 
 func (r realIPIPNetlink) RunCmd(name string, args ...string) error {
 	cmd := exec.Command(name, args...)
-	return cmd.Run()
+	// Capture the output in memory rather than leaving the child's stdout/stderr pointed at
+	// /dev/null so that we can include it in the error, if the command fails.
+	output, err := cmd.CombinedOutput()
+	if err != nil {
+		return fmt.Errorf("%s failed: %w: %s", name, err, output)
+	}
+	return nil
 }
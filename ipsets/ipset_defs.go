@@ -18,7 +18,6 @@ import (
 	"github.com/prometheus/client_golang/prometheus"
 	log "github.com/sirupsen/logrus"
 
-	"regexp"
 	"strings"
 
 	"fmt"
@@ -103,14 +102,33 @@ func (p V6IPPort) String() string {
 }
 
 func (t IPSetType) IsMemberIPV6(member string) bool {
+	return t.memberIPV6Checker()(member)
+}
+
+// memberIPV6Checker returns the function that IsMemberIPV6 uses for this type of IP set.  Callers
+// that check many members of the same IP set can use it to do the type dispatch only once.
+func (t IPSetType) memberIPV6Checker() func(member string) bool {
 	switch t {
 	case IPSetTypeHashIP, IPSetTypeHashNet:
-		return strings.Contains(member, ":")
+		return isIPOrNetMemberIPV6
 	case IPSetTypeHashIPPort:
-		return strings.Contains(strings.Split(member, ",")[0], ":")
+		return isIPPortMemberIPV6
 	}
 	log.WithField("type", string(t)).Panic("Unknown IPSetType")
-	return false
+	return nil
+}
+
+func isIPOrNetMemberIPV6(member string) bool {
+	return strings.Contains(member, ":")
+}
+
+func isIPPortMemberIPV6(member string) bool {
+	// Only look at the IP part, before the first comma.
+	ipPart := member
+	if comma := strings.IndexByte(member, ','); comma >= 0 {
+		ipPart = member[:comma]
+	}
+	return strings.Contains(ipPart, ":")
 }
 
 // CanonicaliseMember converts the string representation of an IP set member to a canonical
@@ -240,11 +258,13 @@ type ipSet struct {
 // IPVersionConfig wraps up the metadata for a particular IP version.  It can be used by
 // this and other components to calculate IP set names from IP set IDs, for example.
 type IPVersionConfig struct {
-	Family                IPFamily
-	setNamePrefix         string
-	tempSetNamePrefix     string
-	mainSetNamePrefix     string
-	ourNamePrefixesRegexp *regexp.Regexp
+	Family            IPFamily
+	setNamePrefix     string
+	tempSetNamePrefix string
+	mainSetNamePrefix string
+	// ourNamePrefixes contains the prefixes of all the IP set names that we've ever used for this
+	// IP version; OwnsIPSet matches against them with plain prefix checks.
+	ourNamePrefixes []string
 }
 
 const (
@@ -282,19 +302,14 @@ func NewIPVersionConfig(
 		versionedPrefixes = append(versionedPrefixes, prefix+version)
 	}
 	versionedPrefixes = append(versionedPrefixes, extraUnversionedIPSets...)
-	for i, pfx := range versionedPrefixes {
-		versionedPrefixes[i] = regexp.QuoteMeta(pfx)
-	}
-	ourNamesPattern := "^(" + strings.Join(versionedPrefixes, "|") + ")"
-	log.WithField("regexp", ourNamesPattern).Debug("Calculated IP set name regexp.")
-	ourNamesRegexp := regexp.MustCompile(ourNamesPattern)
+	log.WithField("prefixes", versionedPrefixes).Debug("Calculated IP set name prefixes.")
 
 	return &IPVersionConfig{
-		Family:                family,
-		setNamePrefix:         versionedPrefix,
-		tempSetNamePrefix:     versionedPrefix + tempIpsetToken,
-		mainSetNamePrefix:     versionedPrefix + mainIpsetToken,
-		ourNamePrefixesRegexp: ourNamesRegexp,
+		Family:            family,
+		setNamePrefix:     versionedPrefix,
+		tempSetNamePrefix: versionedPrefix + tempIpsetToken,
+		mainSetNamePrefix: versionedPrefix + mainIpsetToken,
+		ourNamePrefixes:   versionedPrefixes,
 	}
 }
 
@@ -315,7 +330,12 @@ func (c IPVersionConfig) NameForMainIPSet(setID string) string {
 // OwnsIPSet returns true if the given IP set name appears to belong to Felix.  i.e. whether it
 // starts with an expected prefix.
 func (c IPVersionConfig) OwnsIPSet(setName string) bool {
-	return c.ourNamePrefixesRegexp.MatchString(setName)
+	for _, prefix := range c.ourNamePrefixes {
+		if strings.HasPrefix(setName, prefix) {
+			return true
+		}
+	}
+	return false
 }
 
 func (c IPVersionConfig) IsTempIPSetName(setName string) bool {
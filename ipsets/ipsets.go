@@ -19,7 +19,8 @@ import (
 	"bytes"
 	"fmt"
 	"io"
-	"strings"
+	"regexp"
+	"strconv"
 	"time"
 
 	"github.com/prometheus/client_golang/prometheus"
@@ -28,13 +29,30 @@ import (
 	"github.com/projectcalico/libcalico-go/lib/set"
 )
 
+var (
+	// Prefixes of the lines of interest in the output of "ipset list".
+	namePrefix    = []byte("Name: ")
+	membersPrefix = []byte("Members:")
+)
+
+// restoreErrLineRegexp matches the line number that ipset restore reports when a line fails.
+var restoreErrLineRegexp = regexp.MustCompile(`Error in line (\d+):`)
+
 // IPSets manages a whole "plane" of IP sets, i.e. all the IPv4 sets, or all the IPv6 IP sets.
+//
+// An IPSets is not safe for concurrent use; the dataplane drives each instance from a single
+// goroutine at a time.  Different instances may be applied concurrently because the names of the
+// IP sets that they manage (including their temporary IP sets) are disjoint, so one instance
+// never creates, swaps or deletes an IP set that the other is working on.
 type IPSets struct {
 	IPVersionConfig *IPVersionConfig
 
 	ipSetIDToIPSet       map[string]*ipSet
 	mainIPSetNameToIPSet map[string]*ipSet
 
+	// existingIPSetNames is our cache of the names of the IP sets that exist in the dataplane.
+	// It is loaded by each resync and kept up to date as we create and delete IP sets, so that
+	// we never need to probe the dataplane to find out whether a particular IP set exists.
 	existingIPSetNames set.Set
 	nextTempIPSetIdx   uint
 
@@ -58,9 +76,9 @@ type IPSets struct {
 
 	logCxt *log.Entry
 
-	// restoreInCopy holds a copy of the stdin that we send to ipset restore.  It is reset
-	// after each use.
-	restoreInCopy bytes.Buffer
+	// restoreInCopy holds a copy of (the start of) the stdin that we send to ipset restore.  It is
+	// reset after each use.
+	restoreInCopy truncatingBuffer
 	// stdoutCopy holds a copy of the the stdout emitted by ipset restore. It is reset after
 	// each use.
 	stdoutCopy bytes.Buffer
@@ -108,19 +126,32 @@ func NewIPSetsWithShims(
 
 // AddOrReplaceIPSet queues up the creation (or replacement) of an IP set.  After the next call
 // to ApplyUpdates(), the IP sets will be replaced with the new contents and the set's metadata
-// will be updated as appropriate.
+// will be updated as appropriate.  If the IP set has already been programmed with identical
+// metadata, the replacement is applied as add/del deltas against its current members rather
+// than by swapping in a temporary IP set.
 func (s *IPSets) AddOrReplaceIPSet(setMetadata IPSetMetadata, members []string) {
 	// We need to convert members to a canonical representation (which may be, for example,
 	// an ip.Addr instead of a string) so that we can compare them with members that we read
 	// back from the dataplane.  This also filters out IPs of the incorrect IP version.
+	canonMembers := s.filterAndCanonicaliseMembers(setMetadata.Type, members)
+	setID := setMetadata.SetID
+
+	if oldIPSet := s.ipSetIDToIPSet[setID]; oldIPSet != nil &&
+		oldIPSet.IPSetMetadata == setMetadata &&
+		oldIPSet.pendingReplace == nil {
+		// We've already programmed this IP set with the same metadata and we know what's in
+		// the dataplane.  Rather than rewriting the whole IP set via a temporary IP set, queue
+		// up the deltas between its current members and the new ones.
+		s.queueDeltasForReplace(oldIPSet, canonMembers)
+		return
+	}
+
 	s.logCxt.WithFields(log.Fields{
-		"setID":   setMetadata.SetID,
+		"setID":   setID,
 		"setType": setMetadata.Type,
 	}).Info("Queueing IP set for creation")
-	canonMembers := s.filterAndCanonicaliseMembers(setMetadata.Type, members)
 
 	// Create the IP set struct and store it off.
-	setID := setMetadata.SetID
 	ipSet := &ipSet{
 		IPSetMetadata:    setMetadata,
 		MainIPSetName:    s.IPVersionConfig.NameForMainIPSet(setID),
@@ -138,6 +169,35 @@ func (s *IPSets) AddOrReplaceIPSet(setMetadata IPSetMetadata, members []string)
 	s.pendingIPSetDeletions.Discard(ipSet.MainIPSetName)
 }
 
+// queueDeltasForReplace replaces the pending adds and deletions of an IP set that is in
+// delta-writing mode with the differences between its dataplane members and newMembers.
+func (s *IPSets) queueDeltasForReplace(ipSet *ipSet, newMembers set.Set) {
+	pendingAdds := set.New()
+	newMembers.Iter(func(item interface{}) error {
+		if !ipSet.members.Contains(item) {
+			pendingAdds.Add(item)
+		}
+		return nil
+	})
+	pendingDeletions := set.New()
+	ipSet.members.Iter(func(item interface{}) error {
+		if !newMembers.Contains(item) {
+			pendingDeletions.Add(item)
+		}
+		return nil
+	})
+	ipSet.pendingAdds = pendingAdds
+	ipSet.pendingDeletions = pendingDeletions
+	s.logCxt.WithFields(log.Fields{
+		"setID":           ipSet.SetID,
+		"numDeltaAdds":    pendingAdds.Len(),
+		"numDeltaDeletes": pendingDeletions.Len(),
+	}).Info("IP set already programmed, queueing deltas instead of a rewrite")
+	if pendingAdds.Len() > 0 || pendingDeletions.Len() > 0 {
+		s.dirtyIPSetIDs.Add(ipSet.SetID)
+	}
+}
+
 // RemoveIPSet queues up the removal of an IP set, it need not be empty.  The IP sets will be
 // removed on the next call to ApplyDeletions().
 func (s *IPSets) RemoveIPSet(setID string) {
@@ -249,11 +309,20 @@ func ipSetMemberSetToStringSet(ipsetMembers set.Set /*<ipSetMember>*/) set.Set /
 	return stringSet
 }
 
+// filterAndCanonicaliseMembers filters out members of the wrong IP version and converts the
+// remainder to their canonical form.  Since the result is a set of canonical members, duplicates
+// (including different spellings of the same CIDR) collapse to a single entry; that matters
+// because "ipset restore" rejects an "add" of a member that is already present.
 func (s *IPSets) filterAndCanonicaliseMembers(ipSetType IPSetType, members []string) set.Set {
 	filtered := set.New()
+	if len(members) == 0 {
+		return filtered
+	}
 	wantIPV6 := s.IPVersionConfig.Family == IPFamilyV6
+	// All the members are of the same type so look up the type-specific check once, up front.
+	isMemberIPV6 := ipSetType.memberIPV6Checker()
 	for _, member := range members {
-		isIPV6 := ipSetType.IsMemberIPV6(member)
+		isIPV6 := isMemberIPV6(member)
 		if wantIPV6 != isIPV6 {
 			continue
 		}
@@ -380,7 +449,25 @@ func (s *IPSets) tryResync() (numProblems int, err error) {
 	//
 	// As we stream through the data, we extract the name of the IP set and its members. We
 	// use the IP set's metadata to convert each member to its canonical form for comparison.
-	cmd := s.newCmd("ipset", "list")
+	//
+	// If none of our IP sets has members that we need to compare (for example, at start of day,
+	// when we're about to rewrite all of them) then we only need the names of the IP sets.  In
+	// that case, we use "ipset list -n", which lists one name per line and avoids dumping every
+	// member of every IP set.
+	namesOnly := true
+	for _, ipSet := range s.ipSetIDToIPSet {
+		if ipSet.members != nil {
+			namesOnly = false
+			break
+		}
+	}
+	var cmd CmdIface
+	if namesOnly {
+		s.logCxt.Debug("No IP set members to compare, only listing IP set names.")
+		cmd = s.newCmd("ipset", "list", "-n")
+	} else {
+		cmd = s.newCmd("ipset", "list")
+	}
 	// Grab stdout as a pipe so we can stream through the (potentially very large) output.
 	out, err := cmd.StdoutPipe()
 	if err != nil {
@@ -408,14 +495,24 @@ func (s *IPSets) tryResync() (numProblems int, err error) {
 	// by a factor of 3-4x!
 	debug := log.GetLevel() >= log.DebugLevel
 
+	// Work on the scanner's byte slices rather than converting every line to a string; most
+	// of the header lines are skipped so we only need to allocate strings for names and members.
 	for scanner.Scan() {
-		line := scanner.Text()
-		if strings.HasPrefix(line, "Name:") {
-			ipSetName = strings.Split(line, " ")[1]
+		line := scanner.Bytes()
+		if namesOnly {
+			if len(line) > 0 {
+				s.existingIPSetNames.Add(string(line))
+			}
+			continue
+		}
+		if bytes.HasPrefix(line, namePrefix) {
+			ipSetName = string(line[len(namePrefix):])
 			s.existingIPSetNames.Add(ipSetName)
-			s.logCxt.WithField("setName", ipSetName).Debug("Parsing IP set.")
+			if debug {
+				s.logCxt.WithField("setName", ipSetName).Debug("Parsing IP set.")
+			}
 		}
-		if strings.HasPrefix(line, "Members:") {
+		if bytes.HasPrefix(line, membersPrefix) {
 			// Start of a Members entry, following this, there'll be one member per
 			// line then EOF or a blank line.
 
@@ -617,6 +714,16 @@ func (s *IPSets) tryResync() (numProblems int, err error) {
 // 'ipset restore' session in order to minimise process forking overhead.  Note: unlike
 // 'iptables-restore', 'ipset restore' is not atomic, updates are applied individually.
 func (s *IPSets) tryUpdates() error {
+	// All the dirty IP sets are written in a single ipset restore session.  Drop any IP sets whose
+	// pending changes cancelled out (for example, a member was added and then removed again before
+	// we got here) so that we don't start an ipset restore with nothing to do.
+	s.dirtyIPSetIDs.Iter(func(item interface{}) error {
+		ipSet := s.ipSetIDToIPSet[item.(string)]
+		if ipSet.pendingReplace == nil && ipSet.pendingAdds.Len() == 0 && ipSet.pendingDeletions.Len() == 0 {
+			return set.RemoveItem
+		}
+		return nil
+	})
 	if s.dirtyIPSetIDs.Len() == 0 {
 		s.logCxt.Debug("No dirty IP sets.")
 		return nil
@@ -753,15 +860,19 @@ func (s *IPSets) writeUpdates(ipSet *ipSet, w io.Writer) error {
 // writeFullRewrite calculates the ipset restore input required to do a full, atomic, idempotent
 // rewrite of the IP set and writes it to the given io.Writer.
 func (s *IPSets) writeFullRewrite(ipSet *ipSet, out io.Writer, logCxt log.FieldLogger) (err error) {
+	// Figure out if debug logging is enabled so we can skip per-line logging (and the associated
+	// allocations) in the tight loop below if the log wouldn't be emitted anyway.
+	debug := log.GetLevel() >= log.DebugLevel
+
 	// writeLine until an error occurs, writeLine writes a line to the output, after an error,
 	// it is a no-op.
-	writeLine := func(format string, a ...interface{}) {
+	writeLine := func(lineBytes []byte) {
 		if err != nil {
 			return
 		}
-		line := fmt.Sprintf(format, a...) + "\n"
-		logCxt.WithField("line", line).Debug("Writing line to ipset restore")
-		lineBytes := []byte(line)
+		if debug {
+			logCxt.WithField("line", string(lineBytes)).Debug("Writing line to ipset restore")
+		}
 		_, err = out.Write(lineBytes)
 		if err != nil {
 			logCxt.WithError(err).WithFields(log.Fields{
@@ -771,33 +882,54 @@ func (s *IPSets) writeFullRewrite(ipSet *ipSet, out io.Writer, logCxt log.FieldL
 		}
 		countNumIPSetLinesExecuted.Inc()
 	}
+	writeLinef := func(format string, a ...interface{}) {
+		writeLine([]byte(fmt.Sprintf(format, a...) + "\n"))
+	}
+	// writeAdds writes an "add" line for each member of the pending replacement.  It renders
+	// each line into a reusable buffer rather than formatting a new string per member.
+	writeAdds := func(setName string) {
+		var lineBuf []byte
+		ipSet.pendingReplace.Iter(func(item interface{}) error {
+			member := item.(ipSetMember)
+			lineBuf = append(lineBuf[:0], "add "...)
+			lineBuf = append(lineBuf, setName...)
+			lineBuf = append(lineBuf, ' ')
+			lineBuf = append(lineBuf, member.String()...)
+			lineBuf = append(lineBuf, '\n')
+			writeLine(lineBuf)
+			if err != nil {
+				return set.StopIteration
+			}
+			return nil
+		})
+	}
 
-	// Our general approach is to create a temporary IP set with the right contents, then
-	// atomically swap it into place.
 	mainSetName := ipSet.MainIPSetName
 	if !s.existingIPSetNames.Contains(mainSetName) {
-		// Create empty main IP set so we can share the atomic swap logic below.
+		// The main IP set doesn't exist yet so nothing can be referencing it; there's no need
+		// to go via a temporary IP set, we can create and populate the main IP set directly.
 		// Note: we can't use the -exist flag (which should make the create idempotent)
 		// because it still fails if the IP set was previously created with different
 		// parameters.
-		logCxt.WithField("setID", ipSet.SetID).Debug("Pre-creating main IP set")
-		writeLine("create %s %s family %s maxelem %d",
+		logCxt.WithField("setID", ipSet.SetID).Debug("Creating main IP set")
+		writeLinef("create %s %s family %s maxelem %d",
 			mainSetName, ipSet.Type, s.IPVersionConfig.Family, ipSet.MaxSize)
+		writeAdds(mainSetName)
+		return
 	}
+
+	// The main IP set already exists, create a temporary IP set with the right contents, then
+	// atomically swap it into place.
 	tempSetName := s.nextFreeTempIPSetName()
 	// Create the temporary IP set with the current parameters.
-	writeLine("create %s %s family %s maxelem %d",
+	writeLinef("create %s %s family %s maxelem %d",
 		tempSetName, ipSet.Type, s.IPVersionConfig.Family, ipSet.MaxSize)
 	// Write all the members into the temporary IP set.
-	ipSet.pendingReplace.Iter(func(item interface{}) error {
-		member := item.(ipSetMember)
-		writeLine("add %s %s", tempSetName, member)
-		return nil
-	})
+	writeAdds(tempSetName)
 	// Atomically swap the temporary set into place.
-	writeLine("swap %s %s", mainSetName, tempSetName)
+	writeLinef("swap %s %s", mainSetName, tempSetName)
 	// Then remove the temporary set (which was the old main set).
-	writeLine("destroy %s", tempSetName)
+	writeLinef("destroy %s", tempSetName)
 
 	return
 }
@@ -821,11 +953,20 @@ func (s *IPSets) nextFreeTempIPSetName() string {
 // writeDeltas calculates the ipset restore input required to apply the pending adds/deletes to the
 // main IP set.
 func (s *IPSets) writeDeltas(ipSet *ipSet, out io.Writer, logCxt log.FieldLogger) (err error) {
+	debug := log.GetLevel() >= log.DebugLevel
 	mainSetName := ipSet.MainIPSetName
+	var lineBuf []byte
 	ipSet.pendingDeletions.Iter(func(item interface{}) error {
 		member := item.(ipSetMember)
-		logCxt.WithField("member", member).Debug("Writing del")
-		_, err = fmt.Fprintf(out, "del %s %s --exist\n", mainSetName, member)
+		if debug {
+			logCxt.WithField("member", member).Debug("Writing del")
+		}
+		lineBuf = append(lineBuf[:0], "del "...)
+		lineBuf = append(lineBuf, mainSetName...)
+		lineBuf = append(lineBuf, ' ')
+		lineBuf = append(lineBuf, member.String()...)
+		lineBuf = append(lineBuf, " --exist\n"...)
+		_, err = out.Write(lineBuf)
 		if err != nil {
 			return set.StopIteration
 		}
@@ -837,8 +978,15 @@ func (s *IPSets) writeDeltas(ipSet *ipSet, out io.Writer, logCxt log.FieldLogger
 	}
 	ipSet.pendingAdds.Iter(func(item interface{}) error {
 		member := item.(ipSetMember)
-		logCxt.WithField("member", member).Debug("Writing add")
-		_, err = fmt.Fprintf(out, "add %s %s\n", mainSetName, member)
+		if debug {
+			logCxt.WithField("member", member).Debug("Writing add")
+		}
+		lineBuf = append(lineBuf[:0], "add "...)
+		lineBuf = append(lineBuf, mainSetName...)
+		lineBuf = append(lineBuf, ' ')
+		lineBuf = append(lineBuf, member.String()...)
+		lineBuf = append(lineBuf, '\n')
+		_, err = out.Write(lineBuf)
 		if err != nil {
 			return set.StopIteration
 		}
@@ -851,46 +999,121 @@ func (s *IPSets) writeDeltas(ipSet *ipSet, out io.Writer, logCxt log.FieldLogger
 // ApplyDeletions tries to delete any IP sets that are no longer needed.
 // Failures are ignored, deletions will be retried the next time we do a resync.
 func (s *IPSets) ApplyDeletions() {
+	var setNames []string
 	s.pendingIPSetDeletions.Iter(func(item interface{}) error {
 		setName := item.(string)
-		logCxt := s.logCxt.WithField("setName", setName)
 		if s.existingIPSetNames.Contains(setName) {
-			logCxt.Info("Deleting IP set.")
-			if err := s.deleteIPSet(setName); err != nil {
-				// Note: we used to set the resyncRequired flag on this path but that can lead to excessive retries if
-				// the problem isn't something that we can fix (for example an external app has made a reference to
-				// our IP set).  Instead, wait for the next timed resync.
-				logCxt.WithError(err).Warning("Failed to delete IP set. Will retry on next resync.")
-			}
+			setNames = append(setNames, setName)
 		}
 		// Always remove the item so we don't retry until the next timed resync.
 		return set.RemoveItem
 	})
+	for setName, err := range s.deleteIPSets(setNames) {
+		// Note: we used to set the resyncRequired flag on this path but that can lead to excessive retries if
+		// the problem isn't something that we can fix (for example an external app has made a reference to
+		// our IP set).  Instead, wait for the next timed resync.
+		s.logCxt.WithError(err).WithField("setName", setName).Warning(
+			"Failed to delete IP set. Will retry on next resync.")
+	}
 
 	// ApplyDeletions() marks the end of the two-phase "apply".  Piggy back on that to
 	// update the gauge that records how many IP sets we own.
 	s.gaugeNumIpsets.Set(float64(len(s.ipSetIDToIPSet)))
 }
 
+// deleteIPSets deletes the given IP sets, returning the error for each IP set that could not be
+// deleted.  Where there is more than one IP set to delete, the deletions are batched into a single
+// 'ipset restore' session.  'ipset restore' stops at the first failure so, if one of the IP sets
+// can't be deleted (for example, because it's still referenced by iptables), we skip over it and
+// resume the batch from the following line.
+func (s *IPSets) deleteIPSets(setNames []string) map[string]error {
+	failures := map[string]error{}
+	for len(setNames) > 1 {
+		numDeleted, err := s.tryDeleteIPSetBatch(setNames)
+		if err != nil && numDeleted < 0 {
+			// Couldn't tell how far the batch got; fall back to deleting one at a time.
+			s.logCxt.WithError(err).Warning("Failed to delete IP sets in batch, retrying individually.")
+			break
+		}
+		for _, setName := range setNames[:numDeleted] {
+			s.logCxt.WithField("setName", setName).Info("Deleted IP set")
+			s.existingIPSetNames.Discard(setName)
+		}
+		if err == nil {
+			return failures
+		}
+		// We know exactly which IP set failed; record it and carry on with the remainder.
+		failures[setNames[numDeleted]] = err
+		setNames = setNames[numDeleted+1:]
+	}
+	for _, setName := range setNames {
+		if err := s.deleteIPSet(setName); err != nil {
+			failures[setName] = err
+		}
+	}
+	return failures
+}
+
+// tryDeleteIPSetBatch tries to delete the given IP sets using a single 'ipset restore' session.  On
+// success, it returns len(setNames).  On failure, it returns the number of IP sets that were deleted
+// before the failing line, or -1 if the failing line couldn't be determined.
+func (s *IPSets) tryDeleteIPSetBatch(setNames []string) (int, error) {
+	var input bytes.Buffer
+	for _, setName := range setNames {
+		input.WriteString("destroy ")
+		input.WriteString(setName)
+		input.WriteByte('\n')
+	}
+	input.WriteString("COMMIT\n")
+
+	s.logCxt.WithField("setNames", setNames).Info("Deleting IP sets.")
+	countNumIPSetCalls.Inc()
+	cmd := s.newCmd("ipset", "restore")
+	cmd.SetStdin(&input)
+	var stderr bytes.Buffer
+	cmd.SetStderr(&stderr)
+	err := cmd.Start()
+	if err == nil {
+		err = cmd.Wait()
+	}
+	if err == nil {
+		return len(setNames), nil
+	}
+	s.logCxt.WithError(err).WithField("stderr", stderr.String()).Debug("ipset restore failed")
+	if m := restoreErrLineRegexp.FindSubmatch(stderr.Bytes()); m != nil {
+		if lineNum, convErr := strconv.Atoi(string(m[1])); convErr == nil && lineNum >= 1 && lineNum <= len(setNames) {
+			return lineNum - 1, err
+		}
+	}
+	return -1, err
+}
+
 // tryTempIPSetDeletions tries to delete any temporary IP sets found by the last resync.
 func (s *IPSets) tryTempIPSetDeletions() {
+	var setNames []string
 	s.pendingTempIPSetDeletions.Iter(func(item interface{}) error {
 		setName := item.(string)
-		logCxt := s.logCxt.WithField("setName", setName)
 		if s.existingIPSetNames.Contains(setName) {
-			logCxt.Info("Deleting IP set.")
-			if err := s.deleteIPSet(setName); err != nil {
-				// Log and carry on; we'll try again in ApplyDeletions().
-				logCxt.WithError(err).Warning("Failed to delete temporary IP set. Will retry...")
-			} else {
-				// Success! Remove from the main pending deletions set too.
-				logCxt.WithField("setName", setName).Info("Successfully removed left-over temporary IP set.")
-				s.pendingIPSetDeletions.Discard(item)
-			}
+			setNames = append(setNames, setName)
 		}
 		// Always remove the item so we don't retry until the next timed resync.
 		return set.RemoveItem
 	})
+	if len(setNames) == 0 {
+		return
+	}
+	failures := s.deleteIPSets(setNames)
+	for _, setName := range setNames {
+		logCxt := s.logCxt.WithField("setName", setName)
+		if err, ok := failures[setName]; ok {
+			// Log and carry on; we'll try again in ApplyDeletions().
+			logCxt.WithError(err).Warning("Failed to delete temporary IP set. Will retry...")
+			continue
+		}
+		// Success! Remove from the main pending deletions set too.
+		logCxt.Info("Successfully removed left-over temporary IP set.")
+		s.pendingIPSetDeletions.Discard(setName)
+	}
 }
 
 func (s *IPSets) deleteIPSet(setName string) error {
@@ -919,6 +1142,44 @@ func (s *IPSets) dumpIPSetsToLog() {
 	s.logCxt.WithField("output", string(output)).Info("Current state of IP sets")
 }
 
+// maxRestoreInputCopySize limits the amount of ipset restore input that we keep for logging on
+// failure.  A full rewrite of a large IP set can run to many megabytes and, since the buffer is
+// reused, keeping a full copy would pin that memory for the lifetime of the process.
+const maxRestoreInputCopySize = 64 * 1024
+
+// truncatingBuffer is an io.Writer that keeps a copy of the first maxRestoreInputCopySize bytes
+// written to it and silently discards the rest.  The buffer is held in a named field, rather than
+// embedded, so that none of the bytes.Buffer write methods can bypass the cap.
+type truncatingBuffer struct {
+	buf       bytes.Buffer
+	truncated bool
+}
+
+func (b *truncatingBuffer) Write(p []byte) (int, error) {
+	room := maxRestoreInputCopySize - b.buf.Len()
+	if len(p) > room {
+		b.truncated = true
+		if room <= 0 {
+			return len(p), nil
+		}
+		_, _ = b.buf.Write(p[:room])
+		return len(p), nil
+	}
+	return b.buf.Write(p)
+}
+
+func (b *truncatingBuffer) String() string {
+	if b.truncated {
+		return b.buf.String() + "... (truncated)"
+	}
+	return b.buf.String()
+}
+
+func (b *truncatingBuffer) Reset() {
+	b.buf.Reset()
+	b.truncated = false
+}
+
 func firstNonNilErr(errs ...error) error {
 	for _, err := range errs {
 		if err != nil {
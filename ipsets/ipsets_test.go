@@ -287,6 +287,47 @@ var _ = Describe("IP sets dataplane", func() {
 			Expect(dataplane.IPSetMembers).To(BeEmpty())
 		})
 
+		It("should batch the deletion of non-temporary IP sets", func() {
+			apply()
+			Expect(dataplane.CmdNames).To(Equal([]string{
+				"list",    // Resync.
+				"destroy", // Early deletion of the temporary IP set.
+				"restore", // Both main IP sets.
+			}))
+		})
+
+		It("should batch the early deletion of temporary IP sets", func() {
+			dataplane.IPSetMembers[v4TempIPSetName2] = set.From("10.0.0.4")
+			apply()
+			Expect(dataplane.IPSetMembers).To(BeEmpty())
+			Expect(dataplane.CmdNames).To(Equal([]string{
+				"list",    // Resync.
+				"restore", // Early deletion of both temporary IP sets.
+				"restore", // Both main IP sets.
+			}))
+		})
+
+		It("should only list IP set names when it has no members to compare", func() {
+			apply()
+			Expect(dataplane.Cmds[0].(*listCmd).NamesOnly).To(BeTrue())
+		})
+
+		It("should delete the remaining IP sets if one fails", func() {
+			dataplane.IPSetMembers["cali40unknown"] = set.From("10.0.0.4")
+			dataplane.FailDestroyNames.Add(v4MainIPSetName2)
+			apply()
+			Expect(dataplane.IPSetMembers).To(Equal(map[string]set.Set{
+				v4MainIPSetName2: set.From("10.0.0.3"),
+			}))
+			Expect(dataplane.AttemptedDestroys).To(ConsistOf(
+				v4TempIPSetName1,
+				v4MainIPSetName,
+				v4MainIPSetName2,
+				"cali40unknown",
+			))
+			Expect(dataplane.TriedToDeleteNonExistent).To(BeFalse())
+		})
+
 		It("should rewrite IP set correctly and clean up temp set", func() {
 			ipsets.AddOrReplaceIPSet(meta, []string{"10.0.0.1", "10.0.0.2"})
 			apply()
@@ -300,6 +341,8 @@ var _ = Describe("IP sets dataplane", func() {
 
 	Describe("with a persistent failure to delete a new temporary IP set", func() {
 		BeforeEach(func() {
+			// Temporary IP sets are only used when the main IP set already exists.
+			dataplane.IPSetMembers[v4MainIPSetName] = set.New()
 			// Lay the trap: this should be the first temp IP set to get used.
 			dataplane.FailDestroyNames.Add(v4TempIPSetName0)
 		})
@@ -314,7 +357,7 @@ var _ = Describe("IP sets dataplane", func() {
 			ipsets.AddOrReplaceIPSet(meta, []string{"10.0.0.1", "10.0.0.2"})
 			apply()
 
-			By("Creating the main IP set and leaving the temp IP set left over.")
+			By("Rewriting the main IP set and leaving the temp IP set left over.")
 			Expect(dataplane.IPSetMembers).To(Equal(map[string]set.Set{
 				v4TempIPSetName0: set.From(),
 				v4MainIPSetName:  set.From("10.0.0.1", "10.0.0.2"),
@@ -425,12 +468,73 @@ var _ = Describe("IP sets dataplane", func() {
 		})
 	})
 
+	It("should create, fill, swap and destroy a temporary IP set in a single restore", func() {
+		dataplane.IPSetMembers[v4MainIPSetName] = set.From("10.0.0.3")
+		ipsets.AddOrReplaceIPSet(meta, v4Members1And2)
+		apply()
+		dataplane.ExpectMembers(map[string][]string{v4MainIPSetName: v4Members1And2})
+		Expect(dataplane.AttemptedDestroys).To(Equal([]string{v4TempIPSetName0}))
+		Expect(dataplane.CmdNames).To(Equal([]string{"list", "restore"}))
+	})
+
+	It("should check for existing IP sets with a single list when creating many IP sets", func() {
+		ipsets.AddOrReplaceIPSet(meta, v4Members1And2)
+		ipsets.AddOrReplaceIPSet(meta2, v4Members1And2)
+		apply()
+		dataplane.ExpectMembers(map[string][]string{
+			v4MainIPSetName:  v4Members1And2,
+			v4MainIPSetName2: v4Members1And2,
+		})
+		Expect(dataplane.CmdNames).To(Equal([]string{"list", "restore"}))
+		Expect(dataplane.Cmds[0].(*listCmd).NamesOnly).To(BeTrue())
+	})
+
+	It("should create a new IP set directly, without a temporary IP set", func() {
+		ipsets.AddOrReplaceIPSet(meta, v4Members1And2)
+		apply()
+		dataplane.ExpectMembers(map[string][]string{v4MainIPSetName: v4Members1And2})
+		Expect(dataplane.AttemptedDestroys).To(BeEmpty())
+	})
+
 	Describe("after creating an IP set", func() {
 		BeforeEach(func() {
 			ipsets.AddOrReplaceIPSet(meta, []string{"10.0.0.1", "10.0.0.2"})
 			apply()
 		})
 
+		It("should list IP set members on resync", func() {
+			dataplane.Cmds = nil
+			resyncAndApply()
+			Expect(dataplane.Cmds[0].(*listCmd).NamesOnly).To(BeFalse())
+		})
+
+		It("a replace with the same metadata should apply deltas rather than a rewrite", func() {
+			dataplane.AttemptedDestroys = nil
+			ipsets.AddOrReplaceIPSet(meta, []string{"10.0.0.2", "10.0.0.3"})
+			apply()
+			dataplane.ExpectMembers(map[string][]string{
+				v4MainIPSetName: {"10.0.0.2", "10.0.0.3"},
+			})
+			// A rewrite would have gone via a temporary IP set, which would then be destroyed.
+			Expect(dataplane.AttemptedDestroys).To(BeEmpty())
+			Expect(dataplane.TriedToAddExistent).To(BeFalse())
+			Expect(dataplane.TriedToDeleteNonExistent).To(BeFalse())
+		})
+
+		It("a no-op replace shouldn't touch the dataplane", func() {
+			dataplane.CmdNames = nil
+			ipsets.AddOrReplaceIPSet(meta, []string{"10.0.0.1", "10.0.0.2"})
+			apply()
+			Expect(dataplane.CmdNames).To(BeNil())
+		})
+
+		It("a replace with a different type should rewrite the IP set", func() {
+			ipsets.AddOrReplaceIPSet(metaCIDRs, []string{"10.0.0.0/16"})
+			apply()
+			Expect(dataplane.IPSetMembers[v4MainIPSetName]).To(Equal(set.From("10.0.0.0/16")))
+			Expect(dataplane.AttemptedDestroys).To(Equal([]string{v4TempIPSetName0}))
+		})
+
 		It("add in its own batch should add the IP", func() {
 			ipsets.AddMembers(ipSetID, []string{"10.0.0.3", "10.0.0.4"})
 			apply()
@@ -454,12 +558,14 @@ var _ = Describe("IP sets dataplane", func() {
 		})
 
 		It("an add, then remove should be squashed", func() {
+			dataplane.CmdNames = nil
 			ipsets.AddMembers(ipSetID, []string{"10.0.0.3"})
 			ipsets.RemoveMembers(ipSetID, []string{"10.0.0.3"})
 			apply()
 			dataplane.ExpectMembers(map[string][]string{
 				v4MainIPSetName: {"10.0.0.1", "10.0.0.2"},
 			})
+			Expect(dataplane.CmdNames).To(BeNil(), "squashed update shouldn't start an ipset restore")
 		})
 		It("a remove, then re-add should be squashed", func() {
 			ipsets.RemoveMembers(ipSetID, []string{"10.0.0.2"})
@@ -722,6 +828,17 @@ var _ = Describe("IP sets dataplane", func() {
 		})
 	})
 
+	It("should de-duplicate members before writing them", func() {
+		// The same CIDR appears twice, once in non-canonical form, and the same IP is added
+		// again after the replace.
+		ipsets.AddOrReplaceIPSet(metaCIDRs, []string{"10.0.0.0/16", "10.0.1.2/16", "10.1.0.0/16"})
+		ipsets.AddMembers(ipSetID, []string{"10.0.0.0/16", "10.1.2.3/16"})
+		apply()
+		Expect(dataplane.IPSetMembers[v4MainIPSetName]).
+			To(Equal(set.From("10.0.0.0/16", "10.1.0.0/16")))
+		Expect(dataplane.TriedToAddExistent).To(BeFalse())
+	})
+
 	It("remove set before apply should be no-op", func() {
 		// This checks that the dirty flag is set by the remove method.
 		ipsets.AddOrReplaceIPSet(meta, []string{"10.0.0.1", "10.0.0.2"})
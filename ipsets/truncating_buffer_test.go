@@ -0,0 +1,65 @@
+// Copyright (c) 2020 Tigera, Inc. All rights reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+package ipsets
+
+import (
+	"io"
+	"strings"
+
+	. "github.com/onsi/ginkgo"
+	. "github.com/onsi/gomega"
+)
+
+var _ = Describe("truncatingBuffer", func() {
+	var buf truncatingBuffer
+
+	BeforeEach(func() {
+		buf = truncatingBuffer{}
+	})
+
+	It("should keep everything up to the limit", func() {
+		data := strings.Repeat("a", maxRestoreInputCopySize)
+		n, err := buf.Write([]byte(data))
+		Expect(err).NotTo(HaveOccurred())
+		Expect(n).To(Equal(maxRestoreInputCopySize))
+		Expect(buf.String()).To(Equal(data))
+	})
+
+	It("should truncate at the limit and report the full write", func() {
+		_, _ = buf.Write([]byte(strings.Repeat("a", maxRestoreInputCopySize-1)))
+		n, err := buf.Write([]byte("bc"))
+		Expect(err).NotTo(HaveOccurred())
+		Expect(n).To(Equal(2))
+		Expect(buf.String()).To(Equal(strings.Repeat("a", maxRestoreInputCopySize-1) + "b... (truncated)"))
+
+		n, err = buf.Write([]byte("d"))
+		Expect(err).NotTo(HaveOccurred())
+		Expect(n).To(Equal(1))
+		Expect(buf.String()).To(HaveSuffix("b... (truncated)"))
+	})
+
+	It("should apply the limit to io.WriteString", func() {
+		_, _ = io.WriteString(&buf, strings.Repeat("a", maxRestoreInputCopySize+10))
+		Expect(buf.String()).To(Equal(strings.Repeat("a", maxRestoreInputCopySize) + "... (truncated)"))
+	})
+
+	It("should clear the truncated flag on Reset", func() {
+		_, _ = buf.Write([]byte(strings.Repeat("a", maxRestoreInputCopySize+1)))
+		buf.Reset()
+		Expect(buf.String()).To(Equal(""))
+		_, _ = buf.Write([]byte("abc"))
+		Expect(buf.String()).To(Equal("abc"))
+	})
+})
@@ -108,9 +108,16 @@ func (d *mockDataplane) newCmd(name string, arg ...string) CmdIface {
 			SetName:   name,
 		}
 	case "list":
-		Expect(len(arg)).To(Equal(1))
+		namesOnly := false
+		if len(arg) == 2 {
+			Expect(arg[1]).To(Equal("-n"))
+			namesOnly = true
+		} else {
+			Expect(len(arg)).To(Equal(1))
+		}
 		cmd = &listCmd{
 			Dataplane: d,
+			NamesOnly: namesOnly,
 			resultC:   make(chan error),
 		}
 	default:
@@ -227,8 +234,8 @@ func (c *restoreCmd) main() {
 
 	defer func() {
 		log.WithField("procResult", result).Info("restore command main is exiting")
-		if c.Stdin != nil && result != nil {
-			c.Stdin.(io.Closer).Close()
+		if closer, ok := c.Stdin.(io.Closer); ok && result != nil {
+			closer.Close()
 		}
 		c.resultC <- result
 	}()
@@ -311,12 +318,13 @@ func (c *restoreCmd) main() {
 			name := parts[1]
 			c.Dataplane.AttemptedDestroys = append(c.Dataplane.AttemptedDestroys, name)
 			if _, ok := c.Dataplane.IPSetMembers[name]; !ok {
-				_, _ = c.Stderr.Write([]byte("set doesn't exist"))
+				_, _ = fmt.Fprintf(c.Stderr, "ipset v6.29: Error in line %d: set doesn't exist", i)
 				result = &exec.ExitError{}
 				return
 			}
-			if c.Dataplane.FailDestroyNames.Contains(name) {
-				_, _ = c.Stderr.Write([]byte("set is in use"))
+			if c.Dataplane.FailDestroyNames.Contains(name) || c.Dataplane.FailNextDestroy {
+				c.Dataplane.FailNextDestroy = false
+				_, _ = fmt.Fprintf(c.Stderr, "ipset v6.29: Error in line %d: set is in use", i)
 				result = &exec.ExitError{}
 				return
 			}
@@ -490,6 +498,7 @@ func (d *destroyCmd) CombinedOutput() ([]byte, error) {
 type listCmd struct {
 	Dataplane *mockDataplane
 	SetName   string
+	NamesOnly bool
 	Stdout    *io.PipeWriter
 	resultC   chan error
 }
@@ -659,6 +668,13 @@ func (c *listCmd) main() {
 		return
 	}
 
+	if c.NamesOnly {
+		for setName := range c.Dataplane.IPSetMembers {
+			fmt.Fprintf(c.Stdout, "%s\n", setName)
+		}
+		return
+	}
+
 	first := true
 	for setName, members := range c.Dataplane.IPSetMembers {
 		if !first {
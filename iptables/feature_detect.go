@@ -60,6 +60,9 @@ type FeatureDetector struct {
 	lock            sync.Mutex
 	featureCache    *Features
 	featureOverride map[string]string
+	// kernelVersion caches the kernel version once we've read it successfully; it can't change
+	// without a reboot.
+	kernelVersion *versionparse.Version
 
 	// Path to file with kernel version
 	GetKernelVersionReader func() (io.Reader, error)
@@ -165,6 +168,9 @@ func (d *FeatureDetector) getIptablesVersion() *versionparse.Version {
 }
 
 func (d *FeatureDetector) getKernelVersion() *versionparse.Version {
+	if d.kernelVersion != nil {
+		return d.kernelVersion
+	}
 	reader, err := d.GetKernelVersionReader()
 	if err != nil {
 		log.WithError(err).Warn("Failed to get the kernel version reader, assuming old version with no optional features")
@@ -175,15 +181,24 @@ func (d *FeatureDetector) getKernelVersion() *versionparse.Version {
 		log.WithError(err).Warn("Failed to get kernel version, assuming old version with no optional features")
 		return v3Dot10Dot0
 	}
+	d.kernelVersion = kernVersion
 	return kernVersion
 }
 
+// countRulesInIptableOutput counts the lines in the given iptables-save output that start with
+// "-" (i.e. rules).  It walks the buffer in place rather than splitting it into lines since the
+// output can be large.
 func countRulesInIptableOutput(in []byte) int {
 	count := 0
-	for _, x := range bytes.Split(in, []byte("\n")) {
-		if len(x) >= 1 && x[0] == '-' {
+	for len(in) > 0 {
+		if in[0] == '-' {
 			count++
 		}
+		nl := bytes.IndexByte(in, '\n')
+		if nl < 0 {
+			break
+		}
+		in = in[nl+1:]
 	}
 	return count
 }
@@ -196,10 +211,14 @@ func countRulesInIptableOutput(in []byte) int {
 func DetectBackend(lookPath func(file string) (string, error), newCmd cmdFactory, specifiedBackend string) string {
 	ip6LgcySave := findBestBinary(lookPath, 6, "legacy", "save")
 	ip4LgcySave := findBestBinary(lookPath, 4, "legacy", "save")
+	// Only convert the (potentially large) outputs to strings if we're going to log them.
+	debug := log.GetLevel() >= log.DebugLevel
 	ip6l, _ := newCmd(ip6LgcySave).Output()
 	ip4l, _ := newCmd(ip4LgcySave).Output()
-	log.WithField("ip6l", string(ip6l)).Debug("Ip6tables legacy save out")
-	log.WithField("ip4l", string(ip4l)).Debug("Iptables legacy save out")
+	if debug {
+		log.WithField("ip6l", string(ip6l)).Debug("Ip6tables legacy save out")
+		log.WithField("ip4l", string(ip4l)).Debug("Iptables legacy save out")
+	}
 	legacyLines := countRulesInIptableOutput(ip6l) + countRulesInIptableOutput(ip4l)
 	var detectedBackend string
 	if legacyLines >= 10 {
@@ -208,9 +227,11 @@ func DetectBackend(lookPath func(file string) (string, error), newCmd cmdFactory
 		ip6NftSave := findBestBinary(lookPath, 6, "nft", "save")
 		ip4NftSave := findBestBinary(lookPath, 4, "nft", "save")
 		ip6n, _ := newCmd(ip6NftSave).Output()
-		log.WithField("ip6n", string(ip6n)).Debug("Ip6tables save out")
 		ip4n, _ := newCmd(ip4NftSave).Output()
-		log.WithField("ip4n", string(ip4n)).Debug("Iptables save out")
+		if debug {
+			log.WithField("ip6n", string(ip6n)).Debug("Ip6tables save out")
+			log.WithField("ip4n", string(ip4n)).Debug("Iptables save out")
+		}
 		nftLines := countRulesInIptableOutput(ip6n) + countRulesInIptableOutput(ip4n)
 		if legacyLines >= nftLines {
 			detectedBackend = "legacy"
@@ -204,6 +204,33 @@ func TestFeatureDetectionOverride(t *testing.T) {
 	}
 }
 
+func TestFeatureDetectionCachesKernelVersion(t *testing.T) {
+	RegisterTestingT(t)
+
+	dataplane := newMockDataplane("filter", map[string][]string{}, "legacy")
+	dataplane.Version = "iptables v1.6.2"
+	featureDetector := NewFeatureDetector(nil)
+	featureDetector.NewCmd = dataplane.newCmd
+	numReads := 0
+	featureDetector.GetKernelVersionReader = func() (io.Reader, error) {
+		numReads++
+		return dataplane.getKernelVersionReader()
+	}
+
+	// A failure to read the kernel version shouldn't be cached.
+	dataplane.FailNextGetKernelVersionReader = true
+	dataplane.KernelVersion = "Linux version 3.14.0"
+	Expect(featureDetector.GetFeatures().SNATFullyRandom).To(BeFalse())
+	featureDetector.RefreshFeatures()
+	Expect(featureDetector.GetFeatures().SNATFullyRandom).To(BeTrue())
+	Expect(numReads).To(Equal(2))
+
+	// But, once we've read it, we shouldn't read it again.
+	featureDetector.RefreshFeatures()
+	featureDetector.RefreshFeatures()
+	Expect(numReads).To(Equal(2))
+}
+
 func TestIptablesBackendDetection(t *testing.T) {
 	RegisterTestingT(t)
 
@@ -311,6 +338,82 @@ func TestIptablesBackendDetection(t *testing.T) {
 	}
 }
 
+func TestIptablesBackendDetectionRuleCounting(t *testing.T) {
+	RegisterTestingT(t)
+
+	legacyRules := func(n int) string {
+		out := ""
+		for i := 0; i < n; i++ {
+			out += fmt.Sprintf("-A INPUT -s 10.0.0.%d -j ACCEPT\n", i)
+		}
+		return out
+	}
+
+	type test struct {
+		name            string
+		legacyOutput    string
+		nftOutput       string
+		expectedBackend string
+	}
+	for _, tst := range []test{
+		{
+			"Only rule lines are counted",
+			"# Generated by iptables-save\n*filter\n" +
+				":INPUT ACCEPT [0:0]\n:FORWARD ACCEPT [0:0]\n:OUTPUT ACCEPT [0:0]\n" +
+				":cali-a - [0:0]\n:cali-b - [0:0]\n:cali-c - [0:0]\n:cali-d - [0:0]\n\n\n" +
+				legacyRules(2) + "COMMIT\n",
+			legacyRules(3),
+			"nft",
+		},
+		{
+			"Commented-out rules aren't counted",
+			"# -A INPUT -j ACCEPT\n# -A INPUT -j DROP\n# -A INPUT -j ACCEPT\n",
+			legacyRules(1),
+			"nft",
+		},
+		{
+			"A rule without a trailing newline is counted",
+			"-A INPUT -j ACCEPT\n-A INPUT -j DROP",
+			legacyRules(2),
+			"legacy",
+		},
+		{
+			"Empty output counts as no rules",
+			"",
+			"",
+			"legacy",
+		},
+	} {
+		tst := tst
+		t.Run("DetectingBackend, testing "+tst.name, func(t *testing.T) {
+			RegisterTestingT(t)
+			cmdF := savedOutputFactory{
+				"iptables-legacy-save":  tst.legacyOutput,
+				"ip6tables-legacy-save": "",
+				"iptables-nft-save":     tst.nftOutput,
+				"ip6tables-nft-save":    "",
+			}
+			Expect(DetectBackend(lookPathAll, cmdF.NewCmd, "auto")).To(Equal(tst.expectedBackend))
+		})
+	}
+}
+
+// savedOutputFactory returns commands that emit the given canned output, indexed by command name.
+type savedOutputFactory map[string]string
+
+func (f savedOutputFactory) NewCmd(name string, arg ...string) CmdIface {
+	return &savedOutputCmd{output: f[name]}
+}
+
+type savedOutputCmd struct {
+	ipOutputCmd
+	output string
+}
+
+func (d *savedOutputCmd) Output() ([]byte, error) {
+	return []byte(d.output), nil
+}
+
 type ipOutputFactory struct {
 	Ip6legacy int
 	Ip4legacy int
@@ -73,7 +73,7 @@ func (b *RestoreInputBuilder) EndTransaction() {
 		log.Panic("EndTransaction() called without active transaction.")
 	}
 	if b.txnOpenerWritten {
-		b.writeFormattedLine("COMMIT")
+		b.writeRawLine("COMMIT")
 	}
 	b.currentTableName = ""
 }
@@ -84,7 +84,20 @@ func (b *RestoreInputBuilder) writeFormattedLine(format string, args ...interfac
 	if err != nil {
 		log.WithError(err).Panic("Failed to write to in-memory buffer")
 	}
-	b.buf.WriteString("\n")
+	b.finishLine()
+}
+
+// writeRawLine writes a pre-rendered line to the internal buffer, appending a new line.  Unlike
+// writeFormattedLine, the line is copied verbatim, which avoids the cost of parsing it as a format string
+// (and avoids mangling any '%' characters that it may contain).
+func (b *RestoreInputBuilder) writeRawLine(line string) {
+	b.buf.WriteString(line)
+	b.finishLine()
+}
+
+// finishLine terminates the current line and updates the line counter.
+func (b *RestoreInputBuilder) finishLine() {
+	b.buf.WriteByte('\n')
 	if b.NumLinesWritten != nil {
 		b.NumLinesWritten.Inc()
 	}
@@ -114,7 +127,7 @@ func (b *RestoreInputBuilder) WriteForwardReference(chainName string) {
 // Panics if there is no open transaction.
 func (b *RestoreInputBuilder) WriteLine(line string) {
 	b.maybeWriteTransactionOpener()
-	b.writeFormattedLine(line)
+	b.writeRawLine(line)
 }
 
 // GetBytesAndReset returns the contents of the buffer and, as a side effect, resets the buffer.  For performance,
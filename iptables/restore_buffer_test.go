@@ -0,0 +1,72 @@
+// Copyright (c) 2020 Tigera, Inc. All rights reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+package iptables
+
+import (
+	. "github.com/onsi/ginkgo"
+	. "github.com/onsi/gomega"
+)
+
+type countingCounter struct {
+	count int
+}
+
+func (c *countingCounter) Inc() {
+	c.count++
+}
+
+var _ = Describe("RestoreInputBuilder", func() {
+	var (
+		buf     RestoreInputBuilder
+		counter *countingCounter
+	)
+
+	BeforeEach(func() {
+		buf = RestoreInputBuilder{}
+		counter = &countingCounter{}
+		buf.NumLinesWritten = counter
+	})
+
+	It("should skip empty transactions", func() {
+		buf.StartTransaction("filter")
+		buf.EndTransaction()
+		Expect(buf.Empty()).To(BeTrue())
+		Expect(counter.count).To(Equal(0))
+	})
+
+	It("should write a complete transaction", func() {
+		buf.StartTransaction("filter")
+		buf.WriteForwardReference("cali-foo")
+		buf.WriteLine("-A cali-foo --jump ACCEPT")
+		buf.EndTransaction()
+		Expect(string(buf.GetBytesAndReset())).To(Equal(
+			"*filter\n" +
+				":cali-foo - -\n" +
+				"-A cali-foo --jump ACCEPT\n" +
+				"COMMIT\n"))
+		Expect(counter.count).To(Equal(4))
+		Expect(buf.Empty()).To(BeTrue())
+	})
+
+	It("should write lines verbatim, even if they contain format verbs", func() {
+		buf.StartTransaction("filter")
+		buf.WriteLine(`-A cali-foo -m comment --comment "100%s" --jump ACCEPT`)
+		buf.EndTransaction()
+		Expect(string(buf.GetBytesAndReset())).To(Equal(
+			"*filter\n" +
+				`-A cali-foo -m comment --comment "100%s" --jump ACCEPT` + "\n" +
+				"COMMIT\n"))
+	})
+})
@@ -17,8 +17,8 @@ package iptables
 import (
 	"crypto/sha256"
 	"encoding/base64"
-	"fmt"
 	"regexp"
+	"strconv"
 	"strings"
 
 	log "github.com/sirupsen/logrus"
@@ -38,50 +38,74 @@ type Rule struct {
 }
 
 func (r Rule) RenderAppend(chainName, prefixFragment string, features *Features) string {
-	fragments := make([]string, 0, 6)
-	fragments = append(fragments, "-A", chainName)
-	return r.renderInner(fragments, prefixFragment, features)
+	return r.renderInner("-A", chainName, "", prefixFragment, features)
 }
 
 func (r Rule) RenderInsert(chainName, prefixFragment string, features *Features) string {
-	fragments := make([]string, 0, 6)
-	fragments = append(fragments, "-I", chainName)
-	return r.renderInner(fragments, prefixFragment, features)
+	return r.renderInner("-I", chainName, "", prefixFragment, features)
 }
 
 func (r Rule) RenderInsertAtRuleNumber(chainName string, ruleNum int, prefixFragment string, features *Features) string {
-	fragments := make([]string, 0, 7)
-	fragments = append(fragments, "-I", chainName, fmt.Sprintf("%d", ruleNum))
-	return r.renderInner(fragments, prefixFragment, features)
+	return r.renderInner("-I", chainName, strconv.Itoa(ruleNum), prefixFragment, features)
 }
 
 func (r Rule) RenderReplace(chainName string, ruleNum int, prefixFragment string, features *Features) string {
-	fragments := make([]string, 0, 7)
-	fragments = append(fragments, "-R", chainName, fmt.Sprintf("%d", ruleNum))
-	return r.renderInner(fragments, prefixFragment, features)
+	return r.renderInner("-R", chainName, strconv.Itoa(ruleNum), prefixFragment, features)
 }
 
-func (r Rule) renderInner(fragments []string, prefixFragment string, features *Features) string {
+// renderInner renders the rule as a single space-separated line.  Since we render (and hash)
+// every rule that we program, it writes directly into a single, pre-sized buffer rather than
+// building and then joining a slice of fragments.
+func (r Rule) renderInner(op, chainName, ruleNum, prefixFragment string, features *Features) string {
+	actionFragment := r.Action.ToFragment(features)
+
+	size := len(op) + 1 + len(chainName) + 1 + len(ruleNum) + 1 + len(prefixFragment) + 1 + len(actionFragment)
+	for _, c := range r.Comment {
+		size += len(c) + len(commentFragPrefix) + 2
+	}
+	for _, m := range r.Match {
+		size += len(m) + 1
+	}
+	var sb strings.Builder
+	sb.Grow(size)
+
+	sb.WriteString(op)
+	sb.WriteByte(' ')
+	sb.WriteString(chainName)
+	if ruleNum != "" {
+		sb.WriteByte(' ')
+		sb.WriteString(ruleNum)
+	}
 	if prefixFragment != "" {
-		fragments = append(fragments, prefixFragment)
+		sb.WriteByte(' ')
+		sb.WriteString(prefixFragment)
 	}
 	for _, c := range r.Comment {
 		c = escapeComment(c)
 		c = truncateComment(c)
-		commentFragment := fmt.Sprintf("-m comment --comment \"%s\"", c)
-		fragments = append(fragments, commentFragment)
+		sb.WriteByte(' ')
+		sb.WriteString(commentFragPrefix)
+		sb.WriteString(c)
+		sb.WriteByte('"')
 	}
-	matchFragment := r.Match.Render()
-	if matchFragment != "" {
-		fragments = append(fragments, matchFragment)
+	// Equivalent to appending r.Match.Render(), if it's non-empty.
+	if len(r.Match) > 1 || (len(r.Match) == 1 && r.Match[0] != "") {
+		for _, m := range r.Match {
+			sb.WriteByte(' ')
+			sb.WriteString(m)
+		}
 	}
-	actionFragment := r.Action.ToFragment(features)
 	if actionFragment != "" {
-		fragments = append(fragments, actionFragment)
+		sb.WriteByte(' ')
+		sb.WriteString(actionFragment)
 	}
-	return strings.Join(fragments, " ")
+	return sb.String()
 }
 
+// commentFragPrefix is the start of a comment match fragment.  It's shared by the rendering of
+// rule comments and of our rule-tracking hash comments (see Table.hashCommentFragPrefix).
+const commentFragPrefix = `-m comment --comment "`
+
 var shellUnsafe = regexp.MustCompile(`[^\w @%+=:,./-]`)
 
 // escapeComment replaces anything other than "safe" shell characters with an
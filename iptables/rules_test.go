@@ -250,6 +250,35 @@ fizz`},
 
 })
 
+var _ = Describe("rule rendering", func() {
+	rule := Rule{
+		Match:   MatchCriteria{"-m foobar --foobar baz", "--in-interface eth0"},
+		Action:  JumpAction{Target: "biff"},
+		Comment: []string{"boz"},
+	}
+
+	It("should render an append", func() {
+		Expect(rule.RenderAppend("test", "PREFIX", &Features{})).To(Equal(
+			`-A test PREFIX -m comment --comment "boz" -m foobar --foobar baz --in-interface eth0 --jump biff`))
+	})
+	It("should render an insert", func() {
+		Expect(rule.RenderInsert("test", "", &Features{})).To(Equal(
+			`-I test -m comment --comment "boz" -m foobar --foobar baz --in-interface eth0 --jump biff`))
+	})
+	It("should render an insert at a rule number", func() {
+		Expect(rule.RenderInsertAtRuleNumber("test", 12, "PREFIX", &Features{})).To(Equal(
+			`-I test 12 PREFIX -m comment --comment "boz" -m foobar --foobar baz --in-interface eth0 --jump biff`))
+	})
+	It("should render a replace", func() {
+		Expect(rule.RenderReplace("test", 3, "PREFIX", &Features{})).To(Equal(
+			`-R test 3 PREFIX -m comment --comment "boz" -m foobar --foobar baz --in-interface eth0 --jump biff`))
+	})
+	It("should render a rule with no match or comment", func() {
+		Expect(Rule{Action: AcceptAction{}}.RenderAppend("test", "", &Features{})).To(Equal(
+			`-A test --jump ACCEPT`))
+	})
+})
+
 func newClosableBuf(s string) *withDummyClose {
 	return (*withDummyClose)(bytes.NewBufferString(s))
 }
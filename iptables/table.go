@@ -46,11 +46,10 @@ var (
 		"raw":    {"PREROUTING", "OUTPUT"},
 	}
 
-	// chainCreateRegexp matches iptables-save output lines for chain forward reference lines.
-	// It captures the name of the chain.
-	chainCreateRegexp = regexp.MustCompile(`^:(\S+)`)
-	// appendRegexp matches an iptables-save output line for an append operation.
-	appendRegexp = regexp.MustCompile(`^-A (\S+)`)
+	// chainCreatePrefix starts iptables-save output lines for chain forward reference lines.
+	chainCreatePrefix = []byte(":")
+	// appendPrefix starts an iptables-save output line for an append operation.
+	appendPrefix = []byte("-A ")
 
 	// Prometheus metrics.
 	countNumRestoreCalls = prometheus.NewCounter(prometheus.CounterOpts{
@@ -193,6 +192,9 @@ type Table struct {
 	// of that chain.
 	chainToAppendedRules map[string][]Rule
 	dirtyInsertAppend    set.Set
+	// chainToInsertAppendHashes caches the hashes of our inserted and appended rules, indexed
+	// by chain name.  Entries are removed when the rules for a chain change.
+	chainToInsertAppendHashes map[string]*insertAppendHashes
 
 	// chainToRuleFragments contains the desired state of our iptables chains, indexed by
 	// chain name.  The values are slices of iptables fragments, such as
@@ -217,10 +219,15 @@ type Table struct {
 	// to slices of rules in that chain.
 	chainToFullRules map[string][]string
 
-	// hashCommentPrefix holds the prefix that we prepend to our rule-tracking hashes.
-	hashCommentPrefix string
+	// hashCommentFragPrefix holds the start of the rule-tracking comment fragment, up to and including
+	// the prefix that we prepend to our rule-tracking hashes.  Precomputed since we render a comment
+	// for every rule that we program.
+	hashCommentFragPrefix string
 	// hashCommentRegexp matches the rule-tracking comment, capturing the rule hash.
 	hashCommentRegexp *regexp.Regexp
+	// hashPrefixBytes is the prefix of our rule-tracking hashes.  Any line that matches
+	// hashCommentRegexp contains it, so it's used as a cheap pre-check before running the regex.
+	hashPrefixBytes []byte
 	// ourChainsRegexp matches the names of chains that are "ours", i.e. start with one of our
 	// prefixes.
 	ourChainsRegexp *regexp.Regexp
@@ -247,11 +254,11 @@ type Table struct {
 	// calicoXtablesLock, if enabled, our implementation of the xtables lock.
 	calicoXtablesLock sync.Locker
 
-	// lockTimeout is the timeout used for iptables-restore's native xtables lock implementation.
-	lockTimeout time.Duration
-	// lockTimeout is the lock probe interval used for iptables-restore's native xtables lock
-	// implementation.
-	lockProbeInterval time.Duration
+	// restoreArgs and restoreArgsWithLock are the arguments that we pass to iptables-restore,
+	// without and with iptables-restore's native xtables lock, respectively.  Precalculated
+	// since they're fixed once the Table is created.
+	restoreArgs         []string
+	restoreArgsWithLock []string
 
 	logCxt *log.Entry
 
@@ -261,6 +268,8 @@ type Table struct {
 
 	// Reusable buffer for writing to iptables.
 	restoreInputBuffer RestoreInputBuilder
+	// Reusable buffers for capturing the output of iptables-restore.
+	restoreOutputBuf, restoreErrBuf bytes.Buffer
 
 	// Factory for making commands, used by UTs to shim exec.Command().
 	newCmd cmdFactory
@@ -376,26 +385,28 @@ func NewTable(
 	}
 
 	table := &Table{
-		Name:                   name,
-		IPVersion:              ipVersion,
-		featureDetector:        detector,
-		chainToInsertedRules:   inserts,
-		chainToAppendedRules:   appends,
-		dirtyInsertAppend:      dirtyInsertAppend,
-		chainNameToChain:       map[string]*Chain{},
-		chainRefCounts:         refcounts,
-		dirtyChains:            set.New(),
-		chainToDataplaneHashes: map[string][]string{},
-		chainToFullRules:       map[string][]string{},
+		Name:                      name,
+		IPVersion:                 ipVersion,
+		featureDetector:           detector,
+		chainToInsertedRules:      inserts,
+		chainToAppendedRules:      appends,
+		dirtyInsertAppend:         dirtyInsertAppend,
+		chainToInsertAppendHashes: map[string]*insertAppendHashes{},
+		chainNameToChain:          map[string]*Chain{},
+		chainRefCounts:            refcounts,
+		dirtyChains:               set.New(),
+		chainToDataplaneHashes:    map[string][]string{},
+		chainToFullRules:          map[string][]string{},
 		logCxt: log.WithFields(log.Fields{
 			"ipVersion": ipVersion,
 			"table":     name,
 		}),
-		hashCommentPrefix: hashPrefix,
-		hashCommentRegexp: hashCommentRegexp,
-		ourChainsRegexp:   ourChainsRegexp,
-		oldInsertRegexp:   oldInsertRegexp,
-		insertMode:        insertMode,
+		hashCommentFragPrefix: commentFragPrefix + hashPrefix,
+		hashCommentRegexp:     hashCommentRegexp,
+		hashPrefixBytes:       []byte(hashPrefix),
+		ourChainsRegexp:       ourChainsRegexp,
+		oldInsertRegexp:       oldInsertRegexp,
+		insertMode:            insertMode,
 
 		// Initialise the write tracking as if we'd just done a write, this will trigger
 		// us to recheck the dataplane at exponentially increasing intervals at startup.
@@ -409,8 +420,8 @@ func NewTable(
 
 		calicoXtablesLock: iptablesWriteLock,
 
-		lockTimeout:       options.LockTimeout,
-		lockProbeInterval: options.LockProbeInterval,
+		restoreArgs:         []string{"--noflush", "--verbose"},
+		restoreArgsWithLock: calculateRestoreArgsWithLock(options.LockTimeout, options.LockProbeInterval),
 
 		newCmd:    newCmd,
 		timeSleep: sleep,
@@ -444,6 +455,27 @@ func NewTable(
 	return table
 }
 
+// calculateRestoreArgsWithLock returns the iptables-restore arguments to use when iptables-restore
+// supports the xtables lock.
+func calculateRestoreArgsWithLock(lockTimeout, lockProbeInterval time.Duration) []string {
+	// Versions of iptables-restore that support the xtables lock also make it impossible to disable.  Make
+	// sure that we configure it to retry and configure for a short retry interval (the default is to try to
+	// acquire the lock only once).
+	lockTimeoutSecs := lockTimeout.Seconds()
+	if lockTimeoutSecs <= 0 {
+		// Before iptables-restore added lock support, we were able to disable the lock completely, which
+		// was indicated by a value <=0 (and was our default).  Newer versions of iptables-restore require the
+		// lock so we override the default and set it to 10s.
+		lockTimeoutSecs = 10
+	}
+	lockProbeMicros := lockProbeInterval.Nanoseconds() / 1000
+	return []string{
+		"--noflush", "--verbose",
+		"--wait", fmt.Sprintf("%.0f", lockTimeoutSecs), // seconds
+		"--wait-interval", fmt.Sprintf("%d", lockProbeMicros), // microseconds
+	}
+}
+
 // Insert or Append rules based on insert mode configuration.
 func (t *Table) InsertOrAppendRules(chainName string, rules []Rule) {
 	t.logCxt.WithField("chainName", chainName).Debug("Updating rule insertions")
@@ -452,6 +484,7 @@ func (t *Table) InsertOrAppendRules(chainName string, rules []Rule) {
 	numRulesDelta := len(rules) - len(oldRules)
 	t.gaugeNumRules.Add(float64(numRulesDelta))
 	t.dirtyInsertAppend.Add(chainName)
+	delete(t.chainToInsertAppendHashes, chainName)
 
 	// Incref any newly-referenced chains, then decref the old ones.  By incrementing first we
 	// avoid marking a still-referenced chain as dirty.
@@ -473,6 +506,7 @@ func (t *Table) AppendRules(chainName string, rules []Rule) {
 	numRulesDelta := len(rules) - len(oldRules)
 	t.gaugeNumRules.Add(float64(numRulesDelta))
 	t.dirtyInsertAppend.Add(chainName)
+	delete(t.chainToInsertAppendHashes, chainName)
 
 	// Incref any newly-referenced chains, then decref the old ones.  By incrementing first we
 	// avoid marking a still-referenced chain as dirty.
@@ -493,6 +527,12 @@ func (t *Table) UpdateChains(chains []*Chain) {
 }
 
 func (t *Table) UpdateChain(chain *Chain) {
+	if oldChain := t.chainNameToChain[chain.Name]; oldChain != nil && reflect.DeepEqual(oldChain, chain) {
+		// No-op update.  Skip it so that we don't invalidate our cache of the dataplane state
+		// and trigger an unnecessary iptables-save on the next Apply().
+		t.logCxt.WithField("chainName", chain.Name).Debug("Chain unchanged, ignoring update.")
+		return
+	}
 	t.logCxt.WithField("chainName", chain.Name).Info("Queueing update of chain.")
 	oldNumRules := 0
 
@@ -703,13 +743,27 @@ func (t *Table) expectedHashesForInsertAppendChain(
 	appendedRules := t.chainToAppendedRules[chainName]
 	allHashes = make([]string, len(insertedRules)+len(appendedRules)+numNonCalicoRules)
 	features := t.featureDetector.GetFeatures()
-	if len(insertedRules) > 0 {
-		ourInsertedHashes = calculateRuleHashes(chainName, insertedRules, features)
-	}
-	if len(appendedRules) > 0 {
-		// Add *append* to chainName to produce a unique hash in case append chain/rules are same
-		// as insert chain/rules above.
-		ourAppendedHashes = calculateRuleHashes(chainName+"*appends*", appendedRules, features)
+	// The hashes only depend on the rules and the features, so we only need to recalculate them
+	// if one of those has changed since last time.  (The feature detector only replaces its
+	// Features struct if the features change.)
+	cached := t.chainToInsertAppendHashes[chainName]
+	if cached != nil && cached.features == features {
+		ourInsertedHashes = cached.inserted
+		ourAppendedHashes = cached.appended
+	} else {
+		if len(insertedRules) > 0 {
+			ourInsertedHashes = calculateRuleHashes(chainName, insertedRules, features)
+		}
+		if len(appendedRules) > 0 {
+			// Add *append* to chainName to produce a unique hash in case append chain/rules are same
+			// as insert chain/rules above.
+			ourAppendedHashes = calculateRuleHashes(chainName+"*appends*", appendedRules, features)
+		}
+		t.chainToInsertAppendHashes[chainName] = &insertAppendHashes{
+			features: features,
+			inserted: ourInsertedHashes,
+			appended: ourAppendedHashes,
+		}
 	}
 	offset := 0
 	if t.insertMode == "append" {
@@ -807,6 +861,24 @@ func (t *Table) attemptToGetHashesAndRulesFromDataplane() (hashes map[string][]s
 	return
 }
 
+// wordAfterPrefix returns the run of non-whitespace bytes that immediately follows prefix at the
+// start of line.  It returns nil if line doesn't start with prefix or if the run is empty.  It's
+// equivalent to matching the regex `^<prefix>(\S+)` but avoids the overhead of the regex engine on
+// the hot path of parsing iptables-save output.
+func wordAfterPrefix(line, prefix []byte) []byte {
+	if !bytes.HasPrefix(line, prefix) {
+		return nil
+	}
+	word := line[len(prefix):]
+	if end := bytes.IndexAny(word, " \t\n\f\r"); end >= 0 {
+		word = word[:end]
+	}
+	if len(word) == 0 {
+		return nil
+	}
+	return word
+}
+
 // readHashesAndRulesFrom scans the given reader containing iptables-save output for this table, extracting
 // our rule hashes and, for all chains we insert into, the full rules.  Entries in the returned map are indexed by
 // chain name.  For rules that we wrote, the hash is extracted from a comment that we added to the rule.
@@ -839,10 +911,9 @@ func (t *Table) readHashesAndRulesFrom(r io.ReadCloser) (hashes map[string][]str
 			logCxt = logCxt.WithField("line", string(line))
 			logCxt.Debug("Parsing line")
 		}
-		captures := chainCreateRegexp.FindSubmatch(line)
-		if captures != nil {
+		if word := wordAfterPrefix(line, chainCreatePrefix); word != nil {
 			// Chain forward-reference, make sure the chain exists.
-			chainName := string(captures[1])
+			chainName := string(word)
 			if debug {
 				logCxt.WithField("chainName", chainName).Debug("Found forward-reference")
 			}
@@ -852,20 +923,25 @@ func (t *Table) readHashesAndRulesFrom(r io.ReadCloser) (hashes map[string][]str
 
 		// Look for append lines, such as "-A chain-name -m foo --foo bar"; these are the
 		// actual rules.
-		captures = appendRegexp.FindSubmatch(line)
-		if captures == nil {
+		word := wordAfterPrefix(line, appendPrefix)
+		if word == nil {
 			// Skip any non-append lines.
 			logCxt.Debug("Not an append, skipping")
 			continue
 		}
-		chainName := string(captures[1])
+		chainName := string(word)
 
 		// Look for one of our hashes on the rule.  We record a zero hash for unknown rules
 		// so that they get cleaned up.  Note: we're implicitly capturing the first match
 		// of the regex.  When writing the rules, we ensure that the hash is written as the
 		// first comment.
 		hash := ""
-		captures = t.hashCommentRegexp.FindSubmatch(line)
+		var captures [][]byte
+		if bytes.Contains(line, t.hashPrefixBytes) {
+			// Only run the regex on lines that might contain one of our hashes; most
+			// non-Calico rules don't.
+			captures = t.hashCommentRegexp.FindSubmatch(line)
+		}
 		if captures != nil {
 			hash = string(captures[1])
 			if debug {
@@ -886,10 +962,10 @@ func (t *Table) readHashesAndRulesFrom(r io.ReadCloser) (hashes map[string][]str
 		// After scanning the input, we prune any chains of full rules that do not contain inserts.
 		if !t.ourChainsRegexp.MatchString(chainName) {
 			// Only store the full rule for Calico rules. Otherwise, we just use the placeholder "-".
+			// We've already matched the line against our regexes above; a non-empty hash means that
+			// it's one of ours.
 			fullRule := "-"
-			if captures := t.hashCommentRegexp.FindSubmatch(line); captures != nil {
-				fullRule = string(line)
-			} else if t.oldInsertRegexp.Find(line) != nil {
+			if hash != "" {
 				fullRule = string(line)
 			}
 
@@ -1108,10 +1184,14 @@ func (t *Table) applyUpdates() error {
 
 	// Make a copy of our full rules map and keep track of all changes made while processing dirtyInsertAppend.
 	// When we've successfully updated iptables, we'll update our cache of chainToFullRules with this map.
-	newChainToFullRules := map[string][]string{}
-	for chain, rules := range t.chainToFullRules {
-		newChainToFullRules[chain] = make([]string, len(rules))
-		copy(newChainToFullRules[chain], rules)
+	// The per-chain slices are never modified in place (we always build a new slice for a chain that we
+	// update) so a shallow copy of the map is enough, and we only need that if there are chains to update.
+	newChainToFullRules := t.chainToFullRules
+	if t.dirtyInsertAppend.Len() > 0 {
+		newChainToFullRules = make(map[string][]string, len(t.chainToFullRules))
+		for chain, rules := range t.chainToFullRules {
+			newChainToFullRules[chain] = rules
+		}
 	}
 
 	// Now calculate iptables updates for our inserted and appended rules, which are used to hook top-level chains.
@@ -1233,7 +1313,7 @@ func (t *Table) applyUpdates() error {
 		chainName := item.(string)
 		if _, ok := t.desiredStateOfChain(chainName); !ok {
 			// Chain deletion
-			buf.WriteLine(fmt.Sprintf("--delete-chain %s", chainName))
+			buf.WriteLine("--delete-chain " + chainName)
 			newHashes[chainName] = nil
 		}
 		return nil // Delay clearing the set until we've programmed iptables.
@@ -1254,35 +1334,18 @@ func (t *Table) applyUpdates() error {
 			t.logCxt.WithField("iptablesInput", inputStr).Debug("Writing to iptables")
 		}
 
-		var outputBuf, errBuf bytes.Buffer
-		args := []string{"--noflush", "--verbose"}
+		outputBuf, errBuf := &t.restoreOutputBuf, &t.restoreErrBuf
+		outputBuf.Reset()
+		errBuf.Reset()
+		args := t.restoreArgs
 		if features.RestoreSupportsLock {
-			// Versions of iptables-restore that support the xtables lock also make it impossible to disable.  Make
-			// sure that we configure it to retry and configure for a short retry interval (the default is to try to
-			// acquire the lock only once).
-			lockTimeout := t.lockTimeout.Seconds()
-			if lockTimeout <= 0 {
-				// Before iptables-restore added lock support, we were able to disable the lock completely, which
-				// was indicated by a value <=0 (and was our default).  Newer versions of iptables-restore require the
-				// lock so we override the default and set it to 10s.
-				lockTimeout = 10
-			}
-			lockProbeMicros := t.lockProbeInterval.Nanoseconds() / 1000
-			timeoutStr := fmt.Sprintf("%.0f", lockTimeout)
-			intervalStr := fmt.Sprintf("%d", lockProbeMicros)
-			args = append(args,
-				"--wait", timeoutStr, // seconds
-				"--wait-interval", intervalStr, // microseconds
-			)
-			log.WithFields(log.Fields{
-				"timeoutSecs":         timeoutStr,
-				"probeIntervalMicros": intervalStr,
-			}).Debug("Using native iptables-restore xtables lock.")
+			args = t.restoreArgsWithLock
+			log.WithField("args", args).Debug("Using native iptables-restore xtables lock.")
 		}
 		cmd := t.newCmd(t.iptablesRestoreCmd, args...)
 		cmd.SetStdin(bytes.NewReader(inputBytes))
-		cmd.SetStdout(&outputBuf)
-		cmd.SetStderr(&errBuf)
+		cmd.SetStdout(outputBuf)
+		cmd.SetStderr(errBuf)
 		countNumRestoreCalls.Inc()
 		// Note: calicoXtablesLock will be a dummy lock if our xtables lock is disabled (i.e. if iptables-restore
 		// supports the xtables lock itself, or if our implementation is disabled by config.
@@ -1337,7 +1400,7 @@ func (t *Table) desiredStateOfChain(chainName string) (chain *Chain, present boo
 }
 
 func (t *Table) commentFrag(hash string) string {
-	return fmt.Sprintf(`-m comment --comment "%s%s"`, t.hashCommentPrefix, hash)
+	return t.hashCommentFragPrefix + hash + `"`
 }
 
 // renderDeleteByIndexLine produces a delete line by rule number. This function is used for cali chains.
@@ -1356,10 +1419,20 @@ func (t *Table) renderDeleteByValueLine(chainName string, ruleNum int) (string,
 
 	rule := rules[ruleNum]
 
-	// Make the append a delete.
+	// Make the append a delete.  The rules that we store come from iptables-save so they should
+	// always start with "-A", in which case we can just swap out the prefix.
+	if strings.HasPrefix(rule, "-A") {
+		return "-D" + rule[len("-A"):], nil
+	}
 	return strings.Replace(rule, "-A", "-D", 1), nil
 }
 
+type insertAppendHashes struct {
+	features *Features
+	inserted []string
+	appended []string
+}
+
 func calculateRuleHashes(chainName string, rules []Rule, features *Features) []string {
 	chain := Chain{
 		Name:  chainName,
@@ -0,0 +1,41 @@
+// Copyright (c) 2020 Tigera, Inc. All rights reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+package iptables
+
+import (
+	. "github.com/onsi/ginkgo/extensions/table"
+	. "github.com/onsi/gomega"
+)
+
+var _ = DescribeTable("wordAfterPrefix",
+	func(line, prefix string, expected interface{}) {
+		word := wordAfterPrefix([]byte(line), []byte(prefix))
+		if expected == nil {
+			Expect(word).To(BeNil())
+		} else {
+			Expect(string(word)).To(Equal(expected))
+		}
+	},
+	Entry("forward reference", ":cali-foo - [0:0]", ":", "cali-foo"),
+	Entry("forward reference with no trailer", ":cali-foo", ":", "cali-foo"),
+	Entry("append", "-A cali-foo -m comment --comment \"cali:abcd\"", "-A ", "cali-foo"),
+	Entry("append with tab", "-A cali-foo\t-j ACCEPT", "-A ", "cali-foo"),
+	Entry("insert isn't an append", "-I cali-foo -j ACCEPT", "-A ", nil),
+	Entry("table header", "*filter", ":", nil),
+	Entry("empty chain name", ": - [0:0]", ":", nil),
+	Entry("missing chain name", "-A ", "-A ", nil),
+	Entry("double space", "-A  cali-foo", "-A ", nil),
+	Entry("empty line", "", ":", nil),
+)
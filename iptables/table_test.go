@@ -215,6 +215,32 @@ func describeEmptyDataplaneTests(dataplaneMode string) {
 			}
 		})
 
+		It("should recalculate the hashes of the chain when its insertions change", func() {
+			table.InsertOrAppendRules("FORWARD", []Rule{
+				{Action: DropAction{}},
+				{Action: AcceptAction{}},
+			})
+			table.Apply()
+			Expect(dataplane.Chains).To(Equal(map[string][]string{
+				"FORWARD": {
+					`-m comment --comment "cali:hecdSCslEjdBPBPo" --jump DROP`,
+					`-m comment --comment "cali:plvr29-ZiKUwbzDV" --jump ACCEPT`,
+				},
+				"INPUT":  {},
+				"OUTPUT": {},
+			}))
+
+			// A resync should then find that the dataplane matches the new hashes.
+			table.InvalidateDataplaneCache("test")
+			dataplane.ResetCmds()
+			table.Apply()
+			if dataplaneMode == "nft" {
+				Expect(dataplane.CmdNames).To(ConsistOf("iptables", "iptables-nft-save"))
+			} else {
+				Expect(dataplane.CmdNames).To(ConsistOf("iptables", "iptables-save"))
+			}
+		})
+
 		Describe("after inserting a rule then updating the insertions", func() {
 			BeforeEach(func() {
 				table.InsertOrAppendRules("FORWARD", []Rule{
@@ -318,6 +344,36 @@ func describeEmptyDataplaneTests(dataplaneMode string) {
 		})
 	})
 
+	Describe("after inserting a rule that depends on the dataplane features", func() {
+		hashOf := func(rule string) string {
+			return strings.Split(rule, `"`)[1]
+		}
+		var oldRule string
+		BeforeEach(func() {
+			table.InsertOrAppendRules("FORWARD", []Rule{
+				{Action: SNATAction{ToAddr: "10.0.0.1"}},
+			})
+			table.Apply()
+			Expect(dataplane.Chains["FORWARD"]).To(HaveLen(1))
+			oldRule = dataplane.Chains["FORWARD"][0]
+			Expect(oldRule).To(HaveSuffix("--jump SNAT --to-source 10.0.0.1"))
+		})
+
+		It("should re-render the rule with a new hash after the features change", func() {
+			// iptables v1.6.0 adds support for fully-random SNAT.
+			dataplane.Version = "iptables v1.6.0\n"
+			featureDetector.RefreshFeatures()
+			table.InvalidateDataplaneCache("features changed")
+			table.Apply()
+
+			Expect(dataplane.Chains["FORWARD"]).To(HaveLen(1))
+			newRule := dataplane.Chains["FORWARD"][0]
+			Expect(newRule).To(HaveSuffix("--jump SNAT --to-source 10.0.0.1 --random-fully"))
+			Expect(hashOf(newRule)).To(HavePrefix("cali:"))
+			Expect(hashOf(newRule)).NotTo(Equal(hashOf(oldRule)))
+		})
+	})
+
 	Describe("after adding a chain", func() {
 		BeforeEach(func() {
 			table.UpdateChains([]*Chain{
@@ -366,6 +422,17 @@ func describeEmptyDataplaneTests(dataplaneMode string) {
 				}))
 			})
 
+			It("should not reload the dataplane state after a no-op chain update", func() {
+				dataplane.ResetCmds()
+				table.UpdateChain(&Chain{
+					Name: "cali-FORWARD",
+					Rules: []Rule{
+						{Action: JumpAction{Target: "cali-foobar"}},
+					}})
+				table.Apply()
+				Expect(dataplane.CmdNames).To(BeEmpty())
+			})
+
 			Describe("after adding a reference from an insert", func() {
 				BeforeEach(func() {
 					table.InsertOrAppendRules("FORWARD", []Rule{
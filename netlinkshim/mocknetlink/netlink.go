@@ -221,6 +221,7 @@ type MockNetlinkDataplane struct {
 	NumLinkDeleteCalls     int
 	ImmediateLinkUp        bool
 	NumRuleListCalls       int
+	NumRouteListCalls      int
 	NumRuleAddCalls        int
 	NumRuleDelCalls        int
 	WireguardConfigUpdated bool
@@ -251,6 +252,7 @@ func (d *MockNetlinkDataplane) ResetDeltas() {
 	d.NumNewNetlinkCalls = 0
 	d.NumNewWireguardCalls = 0
 	d.NumRuleListCalls = 0
+	d.NumRouteListCalls = 0
 	d.NumRuleAddCalls = 0
 	d.NumRuleDelCalls = 0
 	d.AddedRules = nil
@@ -607,6 +609,7 @@ func (d *MockNetlinkDataplane) RouteListFiltered(family int, filter *netlink.Rou
 	defer GinkgoRecover()
 
 	Expect(d.NetlinkOpen).To(BeTrue())
+	d.NumRouteListCalls++
 	if d.shouldFail(FailNextRouteList) {
 		return nil, SimulatedError
 	}
@@ -701,7 +704,7 @@ func (d *MockNetlinkDataplane) RouteDel(route *netlink.Route) error {
 
 // ----- Routetable specific ARP and Conntrack functions -----
 
-func (d *MockNetlinkDataplane) AddStaticArpEntry(cidr ip.CIDR, destMAC net.HardwareAddr, ifaceName string) error {
+func (d *MockNetlinkDataplane) AddStaticArpEntry(cidr ip.CIDR, destMAC net.HardwareAddr, linkAttrs *netlink.LinkAttrs) error {
 	d.mutex.Lock()
 	defer d.mutex.Unlock()
 	defer GinkgoRecover()
@@ -709,6 +712,7 @@ func (d *MockNetlinkDataplane) AddStaticArpEntry(cidr ip.CIDR, destMAC net.Hardw
 	if d.shouldFail(FailNextAddARP) {
 		return SimulatedError
 	}
+	ifaceName := linkAttrs.Name
 	log.WithFields(log.Fields{
 		"cidr":      cidr,
 		"destMac":   destMAC,
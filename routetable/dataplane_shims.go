@@ -1,4 +1,4 @@
-// Copyright (c) 2017 Tigera, Inc. All rights reserved.
+// Copyright (c) 2017-2020 Tigera, Inc. All rights reserved.
 //
 // Licensed under the Apache License, Version 2.0 (the "License");
 // you may not use this file except in compliance with the License.
@@ -16,7 +16,9 @@ package routetable
 
 import (
 	"net"
-	"os/exec"
+	"syscall"
+
+	"github.com/vishvananda/netlink"
 
 	"github.com/projectcalico/felix/ip"
 )
@@ -25,9 +27,16 @@ type conntrackIface interface {
 	RemoveConntrackFlows(ipVersion uint8, ipAddr net.IP)
 }
 
-func addStaticARPEntry(cidr ip.CIDR, destMAC net.HardwareAddr, ifaceName string) error {
-	cmd := exec.Command("arp",
-		"-s", cidr.Addr().String(), destMAC.String(),
-		"-i", ifaceName)
-	return cmd.Run()
+// addStaticARPEntry programs a permanent ARP entry for the given IP on the given link via netlink.  This is
+// equivalent to "arp -s <ip> <mac> -i <iface>" but avoids forking a process per entry.  The caller passes in the
+// link attributes that it already looked up for the route sync so that we don't look up the link again per entry.
+func addStaticARPEntry(cidr ip.CIDR, destMAC net.HardwareAddr, linkAttrs *netlink.LinkAttrs) error {
+	return netlink.NeighSet(&netlink.Neigh{
+		LinkIndex:    linkAttrs.Index,
+		Family:       netlink.FAMILY_V4,
+		State:        netlink.NUD_PERMANENT,
+		Type:         syscall.RTN_UNICAST,
+		IP:           cidr.Addr().AsNetIP(),
+		HardwareAddr: destMAC,
+	})
 }
@@ -168,6 +168,11 @@ type RouteTable struct {
 
 	pendingConntrackCleanups map[ip.Addr]chan struct{}
 
+	// routeSnapshot, if non-nil, holds the routes in our table, indexed by link index, as loaded by a
+	// single route dump at the start of the current apply pass.  Used to avoid one route dump per interface
+	// when many interfaces need a full resync.
+	routeSnapshot map[int][]netlink.Route
+
 	// Whether this route table is managing vxlan routes.
 	vxlan bool
 
@@ -181,7 +186,7 @@ type RouteTable struct {
 
 	// Testing shims, swapped with mock versions for UT
 	newNetlinkHandle  func() (netlinkshim.Interface, error)
-	addStaticARPEntry func(cidr ip.CIDR, destMAC net.HardwareAddr, ifaceName string) error
+	addStaticARPEntry func(cidr ip.CIDR, destMAC net.HardwareAddr, linkAttrs *netlink.LinkAttrs) error
 	conntrack         conntrackIface
 	time              timeshim.Interface
 }
@@ -219,7 +224,7 @@ func NewWithShims(
 	newNetlinkHandle func() (netlinkshim.Interface, error),
 	vxlan bool,
 	netlinkTimeout time.Duration,
-	addStaticARPEntry func(cidr ip.CIDR, destMAC net.HardwareAddr, ifaceName string) error,
+	addStaticARPEntry func(cidr ip.CIDR, destMAC net.HardwareAddr, linkAttrs *netlink.LinkAttrs) error,
 	conntrack conntrackIface,
 	timeShim timeshim.Interface,
 	deviceRouteSourceAddress net.IP,
@@ -501,6 +506,12 @@ func (r *RouteTable) Apply() error {
 
 	graceIfaces := 0
 	for retry := 0; retry < maxApplyRetries; retry++ {
+		if retry == 0 {
+			r.loadRouteSnapshot()
+		} else {
+			// Routes may have been modified by the previous pass; go back to per-interface listing.
+			r.routeSnapshot = nil
+		}
 	ifaceLoop:
 		for ifaceName, ia := range r.ifaceNameToUpdateType {
 			logCxt := r.logCxt.WithField("ifaceName", ifaceName)
@@ -548,6 +559,7 @@ func (r *RouteTable) Apply() error {
 		}
 	}
 
+	r.routeSnapshot = nil
 	r.cleanUpPendingConntrackDeletions()
 
 	// Don't return a failure if there are only interfaces in the cleanup grace period.
@@ -589,6 +601,8 @@ func (r *RouteTable) syncRoutesForLink(ifaceName string, fullSync bool, firstTry
 	// first because this allows us to tidy up configuration for interfaces that no longer have any routes associated
 	// with them.
 	var routesToDelete []netlink.Route
+	var linkAttrs *netlink.LinkAttrs
+	haveLinkAttrs := false
 	updatesFailed := false
 	var resyncErr error
 	if fullSync {
@@ -596,19 +610,28 @@ func (r *RouteTable) syncRoutesForLink(ifaceName string, fullSync bool, firstTry
 		logCxt.Debug("Reconcile against kernel programming")
 		_, _ = r.applyRouteDeltas(ifaceName, deletedConnCIDRs)
 
-		// Now do the resync - this will update our deltas again based on what is not programmed (it's a little bit
-		// circuitous, but simplifies the code paths for resync and delta processing).
-		if routesToDelete, resyncErr = r.fullResyncRoutesForLink(logCxt, ifaceName, deletedConnCIDRs); resyncErr != nil && resyncErr != IfaceGrace {
+		// Try to get the link.  This may fail if it's been deleted out from under us.  The link attributes are
+		// reused below so that we only look up the link once per sync.
+		linkAttrs, resyncErr = r.getLinkAttributes(ifaceName)
+		if resyncErr == nil {
+			haveLinkAttrs = true
+
+			// Now do the resync - this will update our deltas again based on what is not programmed (it's a little
+			// bit circuitous, but simplifies the code paths for resync and delta processing).
+			routesToDelete, resyncErr = r.fullResyncRoutesForLink(logCxt, ifaceName, linkAttrs, deletedConnCIDRs)
+		}
+		if resyncErr != nil && resyncErr != IfaceGrace {
 			// If we hit anything other than an interface-in-grace error, exit now.
 			r.logCxt.WithError(resyncErr).Info("Hit error doing kernel reconciliation")
 			return r.filterErrorByIfaceState(ifaceName, resyncErr, UpdateFailed, firstTry)
 		}
 
-		// Ensure we have static ARP entries for all of our existing routes.
+		// Ensure we have static ARP entries for all of our existing routes.  (If we couldn't get the link then
+		// it's in its grace period; we'll fail below when we try to look it up again.)
 		for _, target := range r.ifaceNameToTargets[ifaceName] {
-			if r.ipVersion == 4 && target.DestMAC != nil {
+			if haveLinkAttrs && r.ipVersion == 4 && target.DestMAC != nil {
 				// TODO(smc) clean up/sync old ARP entries
-				err := r.addStaticARPEntry(target.CIDR, target.DestMAC, ifaceName)
+				err := r.addStaticARPEntry(target.CIDR, target.DestMAC, linkAttrs)
 				if err != nil {
 					logCxt.WithError(err).Warn("Failed to set ARP entry")
 					updatesFailed = true
@@ -620,10 +643,13 @@ func (r *RouteTable) syncRoutesForLink(ifaceName string, fullSync bool, firstTry
 	// Update the cached values from the deltas and get the set of targets to create and delete.
 	targetsToCreate, targetsToDelete := r.applyRouteDeltas(ifaceName, deletedConnCIDRs)
 
-	// Try to get the link.  This may fail if it's been deleted out from under us.
-	linkAttrs, err := r.getLinkAttributes(ifaceName)
-	if err != nil {
-		return err
+	if !haveLinkAttrs {
+		// Try to get the link.  This may fail if it's been deleted out from under us.
+		var err error
+		linkAttrs, err = r.getLinkAttributes(ifaceName)
+		if err != nil {
+			return err
+		}
 	}
 	nl, err := r.getNetlink()
 	if err != nil {
@@ -662,7 +688,7 @@ func (r *RouteTable) syncRoutesForLink(ifaceName string, fullSync bool, firstTry
 		}
 		if r.ipVersion == 4 && target.DestMAC != nil {
 			// TODO(smc) clean up/sync old ARP entries
-			err := r.addStaticARPEntry(target.CIDR, target.DestMAC, ifaceName)
+			err := r.addStaticARPEntry(target.CIDR, target.DestMAC, linkAttrs)
 			if err != nil {
 				logCxt.WithError(err).Warn("Failed to set ARP entry")
 				updatesFailed = true
@@ -755,21 +781,57 @@ func (r *RouteTable) createL3Route(linkAttrs *netlink.LinkAttrs, target Target)
 	return route
 }
 
+// loadRouteSnapshot lists the routes in our table once, grouping them by link index, if more than one
+// interface needs a full resync.  The netlink library dumps the whole table and filters client-side even
+// when filtering by interface so, with many interfaces, per-interface listing is quadratic.  On failure,
+// the snapshot is left unset and fullResyncRoutesForLink falls back to listing routes per interface.
+func (r *RouteTable) loadRouteSnapshot() {
+	r.routeSnapshot = nil
+
+	numFullResyncs := 0
+	for _, ia := range r.ifaceNameToUpdateType {
+		if ia == updateTypeFullResync {
+			numFullResyncs++
+		}
+	}
+	if numFullResyncs <= 1 {
+		return
+	}
+
+	nl, err := r.getNetlink()
+	if err != nil {
+		r.logCxt.Debug("Failed to connect to netlink")
+		return
+	}
+	routeFilter := &netlink.Route{
+		Table: r.tableIndex,
+	}
+	var routeFilterFlags uint64
+	if r.tableIndex != 0 {
+		routeFilterFlags |= netlink.RT_FILTER_TABLE
+	}
+	programmedRoutes, err := nl.RouteListFiltered(r.netlinkFamily, routeFilter, routeFilterFlags)
+	if err != nil {
+		r.logCxt.WithError(err).Warn("Failed to list routes, falling back to per-interface listing.")
+		r.closeNetlink() // Defensive: force a netlink reconnection next time.
+		return
+	}
+	r.routeSnapshot = map[int][]netlink.Route{}
+	for _, route := range programmedRoutes {
+		r.routeSnapshot[route.LinkIndex] = append(r.routeSnapshot[route.LinkIndex], route)
+	}
+}
+
 // fullResyncRoutesForLink performs a full resync of the routes by first listing current routes and correlating against
 // the expected set. After correlation, it will create a set of routes to delete and update the delta routes to add
 // back any missing routes.
-func (r *RouteTable) fullResyncRoutesForLink(logCxt *log.Entry, ifaceName string, deletedConnCIDRs set.Set) ([]netlink.Route, error) {
-	// Get the netlink client and the link attributes
+func (r *RouteTable) fullResyncRoutesForLink(logCxt *log.Entry, ifaceName string, linkAttrs *netlink.LinkAttrs, deletedConnCIDRs set.Set) ([]netlink.Route, error) {
+	// Get the netlink client.
 	nl, err := r.getNetlink()
 	if err != nil {
 		logCxt.Debug("Failed to connect to netlink")
 		return nil, ConnectFailed
 	}
-	// Try to get the link.  This may fail if it's been deleted out from under us.
-	linkAttrs, err := r.getLinkAttributes(ifaceName)
-	if err != nil {
-		return nil, err
-	}
 
 	// In order to allow Calico to run without Felix in an emergency, the CNI plugin pre-adds
 	// the route to the interface.  To avoid flapping the route when Felix sees the interface
@@ -793,7 +855,12 @@ func (r *RouteTable) fullResyncRoutesForLink(logCxt *log.Entry, ifaceName string
 		// Link attributes might be nil for the special "no-OIF" interface name.
 		routeFilter.LinkIndex = linkAttrs.Index
 	}
-	programmedRoutes, err := nl.RouteListFiltered(r.netlinkFamily, routeFilter, routeFilterFlags)
+	var programmedRoutes []netlink.Route
+	if r.routeSnapshot != nil {
+		programmedRoutes = r.routeSnapshot[routeFilter.LinkIndex]
+	} else {
+		programmedRoutes, err = nl.RouteListFiltered(r.netlinkFamily, routeFilter, routeFilterFlags)
+	}
 	if err != nil {
 		// Filter the error so that we don't spam errors if the interface is being torn
 		// down.
@@ -207,6 +207,12 @@ var _ = Describe("RouteTable", func() {
 			Expect(dataplane.RouteKeyToRoute).To(ConsistOf(gatewayRoute))
 			Expect(dataplane.AddedRouteKeys).To(BeEmpty())
 		})
+		It("should list routes only once when resyncing several interfaces", func() {
+			err := rt.Apply()
+			Expect(err).ToNot(HaveOccurred())
+			Expect(dataplane.RouteKeyToRoute).To(ConsistOf(gatewayRoute))
+			Expect(dataplane.NumRouteListCalls).To(Equal(1))
+		})
 		It("should clean up only our routes", func() {
 			err := rt.Apply()
 			Expect(err).ToNot(HaveOccurred())
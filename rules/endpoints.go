@@ -423,6 +423,15 @@ func (r *DefaultRuleRenderer) endpointIptablesChain(
 	}
 }
 
+// Conntrack matches are identical for every endpoint chain so we render them once, up front,
+// rather than once per endpoint.  Sharing them between rules is safe because each is a single
+// append to the nil slice returned by Match(), so len == cap and any further append to one of
+// them copies into a new backing array rather than writing into the shared one.
+var (
+	matchConntrackRelatedEstablished = Match().ConntrackState("RELATED,ESTABLISHED")
+	matchConntrackInvalid            = Match().ConntrackState("INVALID")
+)
+
 func (r *DefaultRuleRenderer) appendConntrackRules(rules []Rule, allowAction Action) []Rule {
 	// Allow return packets for established connections.
 	if allowAction != (AcceptAction{}) {
@@ -430,14 +439,14 @@ func (r *DefaultRuleRenderer) appendConntrackRules(rules []Rule, allowAction Act
 		// make sure we flag the packet as allowed.
 		rules = append(rules,
 			Rule{
-				Match:  Match().ConntrackState("RELATED,ESTABLISHED"),
+				Match:  matchConntrackRelatedEstablished,
 				Action: SetMarkAction{Mark: r.IptablesMarkAccept},
 			},
 		)
 	}
 	rules = append(rules,
 		Rule{
-			Match:  Match().ConntrackState("RELATED,ESTABLISHED"),
+			Match:  matchConntrackRelatedEstablished,
 			Action: allowAction,
 		},
 	)
@@ -445,7 +454,7 @@ func (r *DefaultRuleRenderer) appendConntrackRules(rules []Rule, allowAction Act
 		// Drop packets that aren't either a valid handshake or part of an established
 		// connection.
 		rules = append(rules, Rule{
-			Match:  Match().ConntrackState("INVALID"),
+			Match:  matchConntrackInvalid,
 			Action: DropAction{},
 		})
 	}
@@ -186,12 +186,7 @@ func (r *DefaultRuleRenderer) ProtoRuleToIptablesRules(pRule *proto.Rule, ipVers
 	//
 	// Split the port list into blocks of 15, as per iptables limit and add in the number of
 	// named ports.
-	var ipSetConfig *ipsets.IPVersionConfig
-	if ipVersion == 4 {
-		ipSetConfig = r.IPSetConfigV4
-	} else {
-		ipSetConfig = r.IPSetConfigV6
-	}
+	ipSetConfig := r.ipSetConfig(ipVersion)
 	srcPortSplits := SplitPortList(ruleCopy.SrcPorts)
 	if len(srcPortSplits)+len(ruleCopy.SrcNamedPortIpSetIds) > 1 {
 		// Render a block for the source ports.
@@ -566,12 +561,11 @@ func (r *DefaultRuleRenderer) CalculateRuleMatch(pRule *proto.Rule, ipVersion ui
 			"CalculateRuleMatch() passed more than one CIDR in SrcNet.")
 	}
 
+	// Resolve the IP set config for this IP version once, rather than re-checking the version
+	// for every IP set that the rule refers to.
+	ipSetConfig := r.ipSetConfig(ipVersion)
 	nameForIPSet := func(ipsetID string) string {
-		if ipVersion == 4 {
-			return r.IPSetConfigV4.NameForMainIPSet(ipsetID)
-		} else {
-			return r.IPSetConfigV6.NameForMainIPSet(ipsetID)
-		}
+		return ipSetConfig.NameForMainIPSet(ipsetID)
 	}
 
 	for _, ipsetID := range pRule.SrcIpSetIds {
@@ -196,7 +196,7 @@ func NewWithShims(
 		newRoutetableNetlink,
 		false, // vxlan
 		netlinkTimeout,
-		func(cidr ip.CIDR, destMAC net.HardwareAddr, ifaceName string) error { return nil }, // addStaticARPEntry
+		func(cidr ip.CIDR, destMAC net.HardwareAddr, linkAttrs *netlink.LinkAttrs) error { return nil }, // addStaticARPEntry
 		&noOpConnTrack{},
 		timeShim,
 		nil, //deviceRouteSourceAddress